@@ -0,0 +1,140 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from copy import deepcopy
+
+from qdjarv import Validator
+
+from generate import make_document, make_schema
+
+
+def _phases(validator, doc):
+    msg = deepcopy(doc)
+    objs = msg["data"] + msg.get("included", [])
+    times = {}
+
+    start = time.perf_counter()
+    for obj in objs:
+        validator._flatten_object(obj)
+    times["flatten"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for obj in objs:
+        validator._check_one(obj)
+    times["check_fields"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validator._link(objs)
+    times["link"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validator._verify_includes(msg["data"])
+    times["verify_includes"] = time.perf_counter() - start
+
+    msg = deepcopy(doc)
+    start = time.perf_counter()
+    validator.validate(msg)
+    times["validate"] = time.perf_counter() - start
+    return times
+
+
+def run(args):
+    types, include, fields = make_schema(args.depth, args.width, args.sparse)
+    doc = make_document(args.count, args.included_ratio, args.fanout,
+                        args.depth, args.width, args.seed)
+    validator = Validator(["t0"], types, include=include, fields=fields,
+                          codegen=args.codegen)
+    resources = len(doc["data"]) + len(doc.get("included", []))
+
+    best = {}
+    for _ in range(args.repeat):
+        for phase, t in _phases(validator, doc).items():
+            best[phase] = min(t, best.get(phase, t))
+
+    return {
+        "time": time.time(),
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "params": {
+            "count": args.count,
+            "included_ratio": args.included_ratio,
+            "fanout": args.fanout,
+            "depth": args.depth,
+            "width": args.width,
+            "sparse": args.sparse,
+            "codegen": args.codegen,
+        },
+        "resources": resources,
+        "seconds": best,
+        "resources_per_second": resources / best["validate"],
+    }
+
+
+def _revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous(path, params):
+    last = None
+    try:
+        with open(path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["params"] == params:
+                    last = entry
+    except FileNotFoundError:
+        pass
+    return last
+
+
+def report(result, previous):
+    print(f"{result['resources']} resources, "
+          f"{result['resources_per_second']:,.0f} resources/s")
+    for phase, t in result["seconds"].items():
+        line = f"  {phase:<16} {t * 1000:10.2f} ms"
+        if previous is not None and phase in previous["seconds"]:
+            change = t / previous["seconds"][phase] - 1
+            line += f"  {change:+.1%} vs {previous['revision']}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time qdjarv validation on a synthetic document.")
+    parser.add_argument("--count", type=int, default=1000,
+                        help="top-level resources")
+    parser.add_argument("--included-ratio", type=float, default=1.0,
+                        help="included resources per top-level resource, "
+                             "for each include level")
+    parser.add_argument("--fanout", type=int, default=3,
+                        help="references per to-many relationship")
+    parser.add_argument("--depth", type=int, default=2,
+                        help="include depth")
+    parser.add_argument("--width", type=int, default=8,
+                        help="attributes per type")
+    parser.add_argument("--sparse", type=int, default=None,
+                        help="attributes per type in sparse fields")
+    parser.add_argument("--codegen", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--results", default="bench_results.jsonl",
+                        help="file results are appended to and compared "
+                             "against")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    report(result, _previous(args.results, result["params"]))
+    with open(args.results, "a") as f:
+        f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import random
+
+from qdjarv import Rel, Type
+
+
+def make_schema(depth=2, width=8, sparse=None):
+    # Types t0 .. t{depth}, each with width attributes, alternating strings
+    # and ints, and a to-many "children" relationship to the next type.
+    # Returns types, include and fields, limited to the first sparse
+    # attributes of each type if sparse is given.
+    types = {}
+    fields = {}
+    for level in range(depth + 1):
+        attrs = {}
+        for i in range(width):
+            attrs[f"a{i}"] = Type(str) if i % 2 == 0 else Type(int)
+        if level < depth:
+            attrs["children"] = Rel([f"t{level + 1}"])
+        types[f"t{level}"] = attrs
+        if sparse is not None:
+            fields[f"t{level}"] = [f"a{i}" for i in range(sparse)]
+            if level < depth:
+                fields[f"t{level}"].append("children")
+
+    include = {}
+    for _ in range(depth):
+        include = {"children": include}
+    return types, include, fields
+
+
+def _resource(level, idx, width, depth, fanout, pool_sizes, rnd):
+    res = {
+        "type": f"t{level}",
+        "id": str(idx),
+        "attributes": {
+            f"a{i}": f"value {idx} {i}" if i % 2 == 0 else idx * i
+            for i in range(width)
+        },
+        "links": {"self": f"http://example.com/t{level}/{idx}"},
+    }
+    if level < depth:
+        child = f"t{level + 1}"
+        pool = pool_sizes[level + 1]
+        res["relationships"] = {
+            "children": {
+                "data": [{"type": child, "id": str(rnd.randrange(pool))}
+                         for _ in range(fanout)],
+            },
+        }
+    return res
+
+
+def make_document(count=1000, included_ratio=1.0, fanout=3, depth=2,
+                  width=8, seed=0):
+    # A compound document with count top-level t0 resources. Each deeper
+    # level gets count * included_ratio included resources, shared between
+    # parents that point to random ones.
+    rnd = random.Random(seed)
+    pool_sizes = [count] + [max(1, int(count * included_ratio))] * depth
+    data = [_resource(0, i, width, depth, fanout, pool_sizes, rnd)
+            for i in range(count)]
+    included = [_resource(level, i, width, depth, fanout, pool_sizes, rnd)
+                for level in range(1, depth + 1)
+                for i in range(pool_sizes[level])]
+    doc = {
+        "links": {"self": "http://example.com/t0"},
+        "data": data,
+    }
+    if included:
+        doc["included"] = included
+    return doc
@@ -1,28 +1,1166 @@
+import asyncio
+import datetime
+import functools
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.parse
+from collections import ChainMap, Counter, OrderedDict, namedtuple
+from collections.abc import Mapping
+
+from qdjarv import _stream
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+
 class ValidationError(Exception):
     pass
 
 
+class ErrorDetail:
+    # One problem found in collect mode. Path is a JSON pointer into the
+    # message as it was received.
+    def __init__(self, path, type_, id_, field, message):
+        self.path = path
+        self.type_ = type_
+        self.id_ = id_
+        self.field = field
+        self.message = message
+
+    def __repr__(self):
+        return f"<ErrorDetail {self.path}: {self.message}>"
+
+
+class ValidationErrors(ValidationError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} validation error(s), first at "
+            f"{errors[0].path}: {errors[0].message}")
+
+
+class _Errors(list):
+    def __init__(self, max_errors):
+        super().__init__()
+        self.max_errors = max_errors
+
+    def add(self, path, obj, field, message):
+        self.append(ErrorDetail(path, obj.get("type"), obj.get("id"), field,
+                                str(message)))
+        if len(self) >= self.max_errors:
+            raise ValidationErrors(list(self))
+
+
+def _pointer(*parts):
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1")
+                   for p in parts)
+
+
 class Rel:
     def __init__(self, type_):
         self.type_ = type_
 
 
-def Type(t):
+class Nullable(Rel):
+    # A relationship that can be left out, or have null data even if it's
+    # to-many. Left out ones read as {"data": None}.
+    def __init__(self, rel):
+        if not isinstance(rel, Rel):
+            raise TypeError("Nullable takes a Rel, use Optional for "
+                            "attributes")
+        super().__init__(rel.type_)
+
+
+# Bump when generated code changes, so stale cache_dir files aren't picked up.
+_CODEGEN_VERSION = 3
+
+_TypePlan = namedtuple("_TypePlan", ["attrs", "rels"])
 
-    def v(obj):
-        if not isinstance(obj, t):
-            raise ValidationError(f"Expected type '{t}', got '{type(obj)}'")
+
+def _type_name(t):
+    if isinstance(t, tuple):
+        return tuple(_type_name(e) for e in t)
+    return f"{t.__module__}.{t.__qualname__}"
+
+
+class Type:
+    def __init__(self, t):
+        self.type_ = t
+
+    def __call__(self, obj):
+        if not isinstance(obj, self.type_):
+            raise ValidationError(
+                f"Expected type '{self.type_}', got '{type(obj)}'")
         return obj
 
+
+# Built-in validators below are recognized by the compiler, fingerprint and
+# the generated code, which check them inline instead of calling them. Their
+# _key tells apart instances that check different things.
+class Optional:
+    # The attribute can be null or left out, both come out as None.
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __call__(self, obj):
+        if obj is None:
+            return None
+        return self.inner(obj)
+
+    def _key(self):
+        return ("optional", _validator_key(self.inner))
+
+
+class Int:
+    # Unlike Type(int), doesn't let bools through.
+    def __call__(self, obj):
+        if type(obj) is not int:
+            raise ValidationError(f"Expected int, got '{type(obj)}'")
+        return obj
+
+    def _key(self):
+        return ("int",)
+
+
+class Float:
+    # Ints are taken too, and turned into floats.
+    def __call__(self, obj):
+        t = type(obj)
+        if t is float:
+            return obj
+        if t is int:
+            return float(obj)
+        raise ValidationError(f"Expected float, got '{t}'")
+
+    def _key(self):
+        return ("float",)
+
+
+class Enum:
+    def __init__(self, *values):
+        self.values = frozenset(values)
+        # So that True doesn't pass for 1.
+        self._types = frozenset(type(v) for v in values)
+
+    def __call__(self, obj):
+        if type(obj) not in self._types or obj not in self.values:
+            expected = sorted(self.values, key=repr)
+            raise ValidationError(f"Expected one of {expected}, got {obj!r}")
+        return obj
+
+    def _key(self):
+        return ("enum", sorted(map(repr, self.values)))
+
+
+class ListOf:
+    # A list with each element checked by inner. If inner returns elements
+    # unchanged (e.g. it's a Type), the list is kept, otherwise a new one is
+    # made.
+    def __init__(self, inner):
+        self.inner = inner
+        self._same = type(inner) in (Type, Int, Enum)
+
+    def __call__(self, obj):
+        if type(obj) is not list:
+            raise ValidationError(f"Expected list, got '{type(obj)}'")
+        inner = self.inner
+        if self._same:
+            for e in obj:
+                inner(e)
+            return obj
+        return [inner(e) for e in obj]
+
+    def _key(self):
+        return ("list", _validator_key(self.inner))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_datetime(s):
+    # Timestamps tend to repeat within and across messages, and datetimes
+    # are immutable, so parses are shared.
+    if s.endswith(("Z", "z")):
+        s = s[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(s)
+
+
+class DateTime:
+    # ISO 8601 string, parsed to a datetime. A trailing Z means UTC. Before
+    # Python 3.11, fromisoformat only takes the forms isoformat writes.
+    def __call__(self, obj):
+        if type(obj) is not str:
+            raise ValidationError(f"Expected str, got '{type(obj)}'")
+        try:
+            return _parse_datetime(obj)
+        except ValueError:
+            raise ValidationError(f"Not an ISO datetime: {obj!r}") from None
+
+    def _key(self):
+        return ("datetime",)
+
+
+def _keeps_value(v):
+    # Whether a validator only checks, returning what it was given.
+    if type(v) in (Type, Int, Enum):
+        return True
+    if type(v) in (Optional, ListOf):
+        return _keeps_value(v.inner)
+    return False
+
+
+def _draw(seed, ot, id_):
+    # Stable pseudo-random number in [0, 1) for a resource.
+    key = f"{seed}/{ot}/{id_}".encode()
+    h = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(h, "big") / 2 ** 64
+
+
+def _validator_key(v):
+    if isinstance(v, Nullable):
+        return ("nullable", repr(v.type_))
+    if isinstance(v, Rel):
+        return ("rel", repr(v.type_))
+    if type(v) is Type:
+        return ("type", _type_name(v.type_))
+    key = getattr(v, "_key", None)
+    if key is not None:
+        return key()
+    return ("call", getattr(v, "__module__", None),
+            getattr(v, "__qualname__", type(v).__qualname__))
+
+
+_CONTAINERS = ("relationships", "attributes", "links", "meta")
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError("This object is read-only")
+
+
+class _FrozenDict(dict):
+    # Read-only dict, for what views and cached results hand out. Copies and
+    # pickles are plain dicts.
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _FrozenList(list):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = _read_only
+    sort = reverse = _read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _freeze(v):
+    # Read-only deep copy of decoded JSON.
+    if isinstance(v, dict):
+        return _FrozenDict((k, _freeze(x)) for k, x in v.items())
+    if isinstance(v, list):
+        return _FrozenList(_freeze(x) for x in v)
     return v
 
 
+class ResourceView(Mapping):
+    # Read-only view of a raw resource that looks like what validate puts in
+    # the message otherwise: attributes and relationships pulled up, the
+    # rest dotted, related resources linked. Nothing in the raw resource is
+    # modified, and linked relationships are read-only too.
+    __slots__ = ("_raw", "_values", "_index", "_rels", "_keys", "_pending")
+
+    def __init__(self, raw, values, index, pending=None):
+        self._raw = raw
+        self._values = values
+        self._index = index
+        self._rels = None
+        self._keys = None
+        # In lazy mode, attribute validators not yet run are looked up here.
+        # It's shared by all views of a type, values tells us what's done.
+        self._pending = pending
+
+    def _lookup(self, ref):
+        if ref is None:
+            return ref
+        return self._index.get((ref["id"], ref["type"]), ref)
+
+    def _rel(self, name):
+        if self._rels is None:
+            self._rels = {}
+        elif name in self._rels:
+            return self._rels[name]
+        rel = self._raw["relationships"][name]
+        if "data" in rel:
+            data = rel["data"]
+            if isinstance(data, list):
+                linked = _FrozenList(self._lookup(d) for d in data)
+                rel = _FrozenDict(rel, data=linked)
+            else:
+                rel = _FrozenDict(rel, data=self._lookup(data))
+                linked = [rel["data"]] if data is not None else []
+            # Unresolved references could be resolved by a later extend.
+            if any(type(d) is not ResourceView for d in linked):
+                return rel
+        self._rels[name] = rel
+        return rel
+
+    def __getitem__(self, key):
+        raw = self._raw
+        if key in self._values:
+            return self._values[key]
+        pending = self._pending
+        if pending is not None and key in pending:
+            value = pending[key](raw.get("attributes", {}).get(key))
+            self._values[key] = value
+            return value
+        attrs = raw.get("attributes")
+        if attrs is not None and key in attrs:
+            return attrs[key]
+        rels = raw.get("relationships")
+        if rels is not None and key in rels:
+            return self._rel(key)
+        if key[:1] == ".":
+            name = key[1:]
+            if name in _CONTAINERS and name in raw:
+                if name == "relationships":
+                    return {k: self._rel(k) for k in raw[name]}
+                return raw[name]
+        elif key not in _CONTAINERS and key in raw:
+            return raw[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        if self._keys is None:
+            raw = self._raw
+            keys = {}
+            for k in raw:
+                keys["." + k if k in _CONTAINERS else k] = None
+            keys.update(dict.fromkeys(raw.get("relationships", ())))
+            keys.update(dict.fromkeys(raw.get("attributes", ())))
+            keys.update(dict.fromkeys(self._values))
+            self._keys = tuple(keys)
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(tuple(iter(self)))
+
+    def ensure_valid(self):
+        if self._pending is not None:
+            for f in self._pending:
+                self[f]
+
+    # Resources can link to each other in loops, so compare by identity.
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"<ResourceView {self._raw['type']}/{self._raw['id']}>"
+
+
+class Document(dict):
+    # What validate returns: the message, plus the link index, so that more
+    # included resources can be linked in later.
+    def __init__(self, message, validator, index, dangling=None,
+                 backlinks=None, rel_names=None):
+        super().__init__(message)
+        self._validator = validator
+        self._index = index
+        self._dangling = dangling
+        # For compact documents, (id, type) -> names of the relationships
+        # the resource came with, since .relationships is gone.
+        self._rel_names = rel_names
+        # With backlinks=True, (type, id) -> [(resource, relationship name)]
+        # for every reference to (type, id), resolved or not.
+        self.backlinks = backlinks
+
+    def extend(self, included):
+        # Validates resources that came after the document, e.g. lazily
+        # loaded relationships, adds them to included and links them both
+        # ways. Earlier resources aren't looked at again. Returns the added
+        # resources.
+        if self._validator is None:
+            raise ValueError("This document can't be extended")
+        return self._validator._extend(self, included)
+
+    def apply(self, update):
+        # Takes a single resource document, like a PATCH or POST response,
+        # and puts its resources into this one. Resources already here are
+        # updated in place, so links to them stay good, new ones are added
+        # to included. Returns the updated (or added) data resource.
+        if self._validator is None:
+            raise ValueError("This document can't be updated")
+        return self._validator._apply(self, update)
+
+    # Pickles and copies are plain dicts, validators might not pickle.
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class ValidatedCache:
+    # Remembers validated messages by content hash (or ETag, if given) and
+    # validator fingerprint, and hands them out again without validating.
+    # Results are shared between callers, so resources in them are
+    # read-only views over the cached message, and everything else in it is
+    # read-only too, but for the top level dict and data and included
+    # lists, which each caller gets a copy of. Validation isn't lazy, since
+    # views validated on first read would be shared. Keeps at most max_size
+    # results, for at most ttl seconds.
+    def __init__(self, validator, max_size=128, ttl=None,
+                 clock=time.monotonic):
+        state = validator.__getstate__()
+        state.update(views=True, lazy=False, slots=False, max_errors=None,
+                     compact=False, tracker=None, backlinks=False)
+        self.validator = Validator(**state)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._fingerprint = validator.fingerprint()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def validate(self, raw, etag=None):
+        if etag is None:
+            data = raw.encode() if isinstance(raw, str) else raw
+            key = ("sha256", hashlib.sha256(data).hexdigest())
+        else:
+            key = ("etag", etag)
+        key += (self._fingerprint,)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, doc = entry
+            if expires is None or self.clock() < expires:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._share(doc)
+            del self._entries[key]
+
+        self.misses += 1
+        doc = self.validator.validate(_freeze(_loads(raw)))
+        data = doc.get("data")
+        views = data if isinstance(data, list) else [data]
+        for v in views + doc.get("included", []):
+            if v is not None:
+                for k, value in v._values.items():
+                    v._values[k] = _freeze(value)
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        self._entries[key] = (expires, doc)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return self._share(doc)
+
+    def _share(self, doc):
+        # Callers get their own top level dict and lists, the rest is
+        # read-only.
+        res = Document(doc, None, doc._index)
+        for k in ("data", "included"):
+            if isinstance(res.get(k), list):
+                res[k] = list(res[k])
+        return res
+
+
+class ResourceStore:
+    # Identity map for resources across validate calls. Resources are kept by
+    # (type, id), newer versions are merged into the first object seen, and
+    # relationships get linked to it. At most max_size resources are kept,
+    # least recently used go first.
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        # Keyed by (id, type), same as Validator._link.
+        self._objects = OrderedDict()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, key):
+        type_, id_ = key
+        return (id_, type_) in self._objects
+
+    def get(self, type_, id_, default=None):
+        key = (id_, type_)
+        obj = self._objects.get(key)
+        if obj is None:
+            return default
+        self._objects.move_to_end(key)
+        return obj
+
+    def clear(self):
+        self._objects.clear()
+
+    def _intern(self, obj):
+        key = (obj["id"], obj["type"])
+        old = self._objects.get(key)
+        if old is None:
+            self._objects[key] = obj
+            max_size = self.max_size
+            if max_size is not None and len(self._objects) > max_size:
+                self._objects.popitem(last=False)
+            return obj
+
+        self._objects.move_to_end(key)
+        if old is not obj:
+            for k, v in obj.items():
+                if k in (".attributes", ".relationships") and k in old:
+                    old[k].update(v)
+                else:
+                    old[k] = v
+        return old
+
+
+class _StoreIndex(ChainMap):
+    # Link index over a message's resources, then a store's. A stored
+    # resource that a reference is resolved to counts as used.
+    def __getitem__(self, key):
+        own, stored = self.maps
+        try:
+            return own[key]
+        except KeyError:
+            pass
+        obj = stored[key]
+        stored.move_to_end(key)
+        return obj
+
+
+class AccessTracker:
+    # Pass to validators as tracker to find out which fields of validated
+    # resources the application reads. Reads are collected per type, across
+    # all validate calls, until clear.
+    def __init__(self):
+        self._seen = {}
+
+    def clear(self):
+        self._seen.clear()
+
+    def accessed(self):
+        # Read fields by type, links, meta, type and id left out.
+        return {ot: sorted(f for f in seen
+                           if f[:1] != "." and f not in ("type", "id"))
+                for ot, seen in self._seen.items()}
+
+    def report(self, validator):
+        res = {}
+        for ot, read in self.accessed().items():
+            o_fields = validator.types.get(ot, {})
+            res[ot] = {
+                "read": [f for f in o_fields if f in read],
+                "unused": [f for f in o_fields if f not in read],
+            }
+        return res
+
+    # Fields filter from what was read, see Validator.narrow. Types none of
+    # whose fields were read keep everything the validator checks: they may
+    # well be read in ways that aren't tracked, and asking for no fields at
+    # all is rarely what you want.
+    def suggest_fields(self, validator):
+        accessed = {}
+        for ot, read in self.accessed().items():
+            o_fields = validator.types.get(ot)
+            if o_fields is not None:
+                read = [f for f in read if f in o_fields]
+                if read:
+                    accessed[ot] = read
+        return validator.derive_fields(accessed)
+
+
+class _TrackedResource(dict):
+    # Resource dict that notes the keys read from it, once validation is
+    # done and _seen is set. Indexing, get and in note one key. Going over
+    # the whole resource, with iteration, keys, items, values or copy, notes
+    # all of them, and so do dict(r), {**r}, json.dumps and pickle, which
+    # go through those. Validation and dump read with dict methods, and
+    # don't count.
+    __slots__ = ("_seen",)
+
+    def __init__(self, obj):
+        super().__init__(obj)
+        self._seen = None
+
+    def __getitem__(self, key):
+        if self._seen is not None:
+            self._seen.add(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if self._seen is not None:
+            self._seen.add(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        if self._seen is not None:
+            self._seen.add(key)
+        return dict.__contains__(self, key)
+
+    def _read_all(self):
+        if self._seen is not None:
+            self._seen.update(dict.keys(self))
+
+    def __iter__(self):
+        self._read_all()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._read_all()
+        return dict.keys(self)
+
+    def items(self):
+        self._read_all()
+        return dict.items(self)
+
+    def values(self):
+        self._read_all()
+        return dict.values(self)
+
+    def copy(self):
+        self._read_all()
+        return dict.copy(self)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class Resource:
+    # Base for the __slots__ classes generated per type in slots mode. Each
+    # subclass maps field names to slot names in _slot_names, since jsonapi
+    # names need not be identifiers.
+    __slots__ = ("type", "id", "_links", "_meta")
+    _slot_names = {}
+
+    @property
+    def links(self):
+        return self._links
+
+    @property
+    def meta(self):
+        return self._meta
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._slot_names[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self._slot_names and hasattr(self, self._slot_names[key])
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.type}/{self.id}>"
+
+    # Generated classes can't be looked up by name, so pickles carry the
+    # class's shape, and the class is made again from it if need be.
+    def __reduce__(self):
+        cls = type(self)
+        state = {}
+        for slot in ("_links", "_meta", *cls._slot_names.values()):
+            if hasattr(self, slot):
+                state[slot] = getattr(self, slot)
+        shape = (self.type, tuple(cls._slot_names.items()), cls._rel_slots)
+        return _new_resource, shape, (None, state)
+
+
+@functools.lru_cache(maxsize=None)
+def _resource_class(ot, slot_names, rel_slots):
+    # One class per shape, shared by validators that agree on it.
+    slot_names = dict(slot_names)
+    return type(_identifier(ot), (Resource,), {
+        "__slots__": tuple(slot_names.values())[2:],
+        "_slot_names": slot_names,
+        "_rel_slots": rel_slots,
+    })
+
+
+def _new_resource(ot, slot_names, rel_slots):
+    cls = _resource_class(ot, slot_names, rel_slots)
+    return cls.__new__(cls)
+
+
+def _identifier(name):
+    name = "".join(c if c.isalnum() or c == "_" else "_" for c in name)
+    if not name.isidentifier():
+        name = "_" + name
+    return name
+
+
+def _related_ids(rel):
+    data = rel.get("data") if isinstance(rel, dict) else None
+    if isinstance(data, list):
+        return [d["id"] for d in data]
+    if data is None:
+        return None
+    return data["id"]
+
+
+_NUMPY_DTYPES = {int: "int64", float: "float64", bool: "bool"}
+
+
+def _numpy_dtype(f_type):
+    if type(f_type) is Type and not isinstance(f_type.type_, tuple):
+        return _NUMPY_DTYPES.get(f_type.type_)
+    if type(f_type) is Int:
+        return "int64"
+    if type(f_type) is Float:
+        return "float64"
+    return None
+
+
+def _numpy_column(np, values, dtype):
+    if dtype is not None:
+        try:
+            return np.array(values, dtype=dtype)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    # Filled one by one, so that lists aren't turned into extra dimensions.
+    col = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        col[i] = v
+    return col
+
+
+class ValidationStats:
+    # Handed to the observer after each validate call. Phases are timed in
+    # seconds, in the order they ran.
+    def __init__(self):
+        self.phases = {}
+        self.resources = Counter()
+        self.fields_checked = 0
+        self.relationships_linked = 0
+        self._checked = Counter()
+        self._last = time.perf_counter()
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+    def _lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def __repr__(self):
+        return (f"<ValidationStats {sum(self.resources.values())} resources "
+                f"in {self.total * 1000:.2f} ms>")
+
+
+def _is_ref(d):
+    return len(d) == 2 and "id" in d and "type" in d
+
+
+def _refs(rels):
+    for rel in rels.values():
+        data = rel.get("data")
+        if isinstance(data, list):
+            yield from data
+        elif data is not None:
+            yield data
+
+
+def _no_lap(phase):
+    pass
+
+
+class _FetchFailed:
+    def __init__(self, exc):
+        self.exc = exc
+
+
 class Validator:
-    def __init__(self, top, types, include=None, fields=None):
+    def __init__(self, top, types, include=None, fields=None,
+                 codegen=False, cache_dir=None, views=False, lazy=False,
+                 slots=False, observer=None, max_errors=None,
+                 sample_rate=None, sample_first=None, seed=0,
+                 compact=False, keep=(".links", ".meta"),
+                 drop_included=False, tracker=None, backlinks=False):
         self.top = top
         self.types = types
         self.include = include if include is not None else {}
         self.fields = fields if fields is not None else {}
+        self.codegen = codegen
+        self.cache_dir = cache_dir
+        self.views = views or lazy
+        self.lazy = lazy
+        self.slots = slots
+        self.observer = observer
+        self.max_errors = max_errors
+        self.sample_rate = sample_rate
+        self.sample_first = sample_first
+        self.seed = seed
+        self.sampling = sample_rate is not None or sample_first is not None
+        self.compact = compact
+        self.keep = frozenset(keep)
+        self.drop_included = drop_included
+        self.tracker = tracker
+        self.backlinks = backlinks
+        # Resources come out as plain dicts, views or slots instances. What
+        # doesn't work with the latter two, all in one place; tests cover
+        # every pair of options.
+        unsupported = {
+            "views": [("compact", compact), ("tracker", tracker is not None),
+                      ("backlinks", backlinks),
+                      ("max_errors", max_errors is not None),
+                      ("slots", slots)],
+            "slots": [("compact", compact), ("tracker", tracker is not None),
+                      ("backlinks", backlinks)],
+        }
+        shape = "views" if self.views else "slots" if slots else None
+        for option, on in unsupported.get(shape, ()):
+            if on:
+                raise ValueError(f"{option} can't be used with {shape}")
+        self._plan = self._compile()
+        self._lazy_attrs = {ot: dict(plan.attrs)
+                            for ot, plan in self._plan.items()}
+        self._nullable = {(ot, f) for ot, plan in self._plan.items()
+                          for f, f_type in plan.rels
+                          if isinstance(f_type, Nullable)}
+        # What's left to do for resources sampling skips, see _fill_unsampled.
+        self._unsampled = {
+            ot: ([(f, f_type) for f, f_type in plan.attrs
+                  if not _keeps_value(f_type)],
+                 [f for f, f_type in plan.attrs
+                  if type(f_type) is Optional and _keeps_value(f_type)],
+                 [f for f, f_type in plan.rels
+                  if isinstance(f_type, Nullable)])
+            for ot, plan in self._plan.items()}
+        self._classes = self._make_classes() if slots else None
+        self._source = None
+        self._query = None
+        if codegen:
+            self._parse_one, self._check_fields = self._codegen(cache_dir)
+
+    # Compiled and generated parts can't be pickled, so rebuild them.
+    def __getstate__(self):
+        return {
+            "top": self.top,
+            "types": self.types,
+            "include": self.include,
+            "fields": self.fields,
+            "codegen": self.codegen,
+            "cache_dir": self.cache_dir,
+            "views": self.views,
+            "lazy": self.lazy,
+            "slots": self.slots,
+            "observer": self.observer,
+            "max_errors": self.max_errors,
+            "sample_rate": self.sample_rate,
+            "sample_first": self.sample_first,
+            "seed": self.seed,
+            "compact": self.compact,
+            "keep": tuple(self.keep),
+            "drop_included": self.drop_included,
+            "tracker": self.tracker,
+            "backlinks": self.backlinks,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _compile(self):
+        # Resolve sparse fields and Rel / attribute dispatch once, so that
+        # _parse_one does no schema interpretation per resource.
+        plan = {}
+        for ot, o_fields in self.types.items():
+            f_filter = self.fields.get(ot)
+            if f_filter is not None:
+                f_filter = set(f_filter)
+            attrs = []
+            rels = []
+            for f, f_type in o_fields.items():
+                if f_filter is not None and f not in f_filter:
+                    continue
+                if isinstance(f_type, Rel):
+                    rels.append((f, f_type))
+                else:
+                    attrs.append((f, f_type))
+            plan[ot] = _TypePlan(tuple(attrs), tuple(rels))
+        return plan
+
+    def _make_classes(self):
+        classes = {}
+        for ot, o_fields in self.types.items():
+            # Type and id are slots on Resource itself.
+            slot_names = {"type": "type", "id": "id"}
+            for f in o_fields:
+                slot = _identifier(f)
+                taken = slot_names.values()
+                while slot in taken or slot in Resource.__slots__:
+                    slot += "_"
+                slot_names[f] = slot
+            rels = tuple(slot_names[f] for f, f_type in o_fields.items()
+                         if isinstance(f_type, Rel))
+            classes[ot] = _resource_class(ot, tuple(slot_names.items()),
+                                          rels)
+        return classes
+
+    def _to_slots(self, message, all_objects):
+        # Runs after linking and include verification, swapping dicts for
+        # instances of the generated classes, links included.
+        made = {}
+        for obj in all_objects:
+            cls = self._classes[obj["type"]]
+            inst = cls.__new__(cls)
+            inst._links = obj.get(".links")
+            inst._meta = obj.get(".meta")
+            for f, slot in cls._slot_names.items():
+                if f in obj:
+                    setattr(inst, slot, obj[f])
+            made[id(obj)] = inst
+
+        def swap(d):
+            if d is None:
+                return d
+            return made.get(id(d), d)
+
+        for inst in made.values():
+            for slot in inst._rel_slots:
+                rel = getattr(inst, slot, None)
+                if rel is None or "data" not in rel:
+                    continue
+                data = rel["data"]
+                if isinstance(data, list):
+                    rel["data"] = [swap(d) for d in data]
+                else:
+                    rel["data"] = swap(data)
+
+        if "data" in message:
+            d = message["data"]
+            if isinstance(d, list):
+                message["data"] = [made[id(v)] for v in d]
+            elif d is not None:
+                message["data"] = made[id(d)]
+        if "included" in message:
+            message["included"] = [made[id(v)] for v in message["included"]]
+
+    def _compact(self, objs, rel_names):
+        # Rebuilds resources without the raw containers already pulled up,
+        # and with interned keys and type names, so long-lived documents
+        # share those strings. Dicts are refilled in place, since links
+        # point to them. Relationship names are noted in rel_names.
+        intern = sys.intern
+        keep = self.keep
+        shared = {}
+        for obj in objs:
+            rels = dict.get(obj, ".relationships", {})
+            names = tuple(intern(k) for k in rels)
+            rel_names[(obj["id"], obj["type"])] = shared.setdefault(names,
+                                                                   names)
+            for rel in rels.values():
+                items = list(rel.items())
+                rel.clear()
+                for k, v in items:
+                    if k == "data":
+                        for d in v if isinstance(v, list) else (v,):
+                            if d is not None and _is_ref(d):
+                                d["type"] = intern(d["type"])
+                    rel[intern(k)] = v
+            items = list(dict.items(obj))
+            obj.clear()
+            for k, v in items:
+                if k[:1] == "." and k not in keep:
+                    continue
+                obj[intern(k)] = v
+            obj["type"] = intern(obj["type"])
+
+    def _codegen_names(self):
+        # Validators can't be spelled out in source, so they're passed in
+        # through the module namespace under positional names.
+        ns = {"ValidationError": ValidationError}
+        names = {}
+        key = []
+        for ot, plan in self._plan.items():
+            attr_key = []
+            for f, f_type in plan.attrs:
+                name = f"_v{len(names)}"
+                names[(ot, f)] = name
+                if type(f_type) is Type:
+                    ns[name] = f_type.type_
+                else:
+                    ns[name] = f_type
+                attr_key.append((f,) + _validator_key(f_type))
+            rel_key = [(f,) + _validator_key(f_type)
+                       for f, f_type in plan.rels]
+            key.append((ot, attr_key, rel_key))
+        key = (_CODEGEN_VERSION, key)
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return ns, names, digest
+
+    def _codegen_source(self, names):
+        lines = []
+        emit = lines.append
+        parsers = []
+        for i, (ot, plan) in enumerate(self._plan.items()):
+            fn = f"_parse_{i}"
+            parsers.append((ot, fn))
+            emit(f"def {fn}(out, attrs, rels):")
+            emit(f"    # {ot!r}")
+            if not plan.attrs and not plan.rels:
+                emit("    pass")
+            for f, f_type in plan.attrs:
+                name = names[(ot, f)]
+                if type(f_type) is Optional:
+                    emit(f"    v = attrs.get({f!r})")
+                    emit("    if v is not None:")
+                    self._emit_check(emit, "        ", f"{name}.inner",
+                                     f_type.inner)
+                    emit(f"    out[{f!r}] = v")
+                    continue
+                emit("    try:")
+                emit(f"        v = attrs[{f!r}]")
+                emit("    except KeyError:")
+                emit("        raise ValidationError("
+                     f"{f'Field {f!r} not found for {ot!r}'!r}) from None")
+                if type(f_type) is Type:
+                    emit(f"    if not isinstance(v, {name}):")
+                    emit("        raise ValidationError(")
+                    emit(f"            f\"Expected type '{{{name}}}', "
+                         "got '{type(v)}'\")")
+                else:
+                    self._emit_check(emit, "    ", name, f_type)
+                emit(f"    out[{f!r}] = v")
+            for f, f_type in plan.rels:
+                emit(f"    r = rels.get({f!r})")
+                if isinstance(f_type, Nullable):
+                    emit("    if r is None:")
+                    emit(f"        out[{f!r}] = {{\"data\": None}}")
+                    emit("    elif \"data\" in r and r[\"data\"] is not None:")
+                else:
+                    emit("    if r is None:")
+                    emit("        raise ValidationError("
+                         f"{f'Relationship {f!r} not found for {ot!r}'!r})")
+                    emit("    if \"data\" in r:")
+                emit("        d = r[\"data\"]")
+                if isinstance(f_type.type_, list):
+                    rel_type = f_type.type_[0]
+                    emit("        if not isinstance(d, list):")
+                    emit("            raise ValidationError("
+                         "\"Expected singleton, got list\")")
+                    emit("        for e in d:")
+                    emit(f"            if e[\"type\"] != {rel_type!r}:")
+                    emit("                raise ValidationError(")
+                    emit(f"                    f\"Expected type {rel_type!r}, "
+                         "got '{e['type']}'\")")
+                else:
+                    rel_type = f_type.type_
+                    emit("        if isinstance(d, list):")
+                    emit("            raise ValidationError("
+                         "\"Expected list, got singleton\")")
+                    emit(f"        if d is not None and d[\"type\"] != "
+                         f"{rel_type!r}:")
+                    emit("            raise ValidationError(")
+                    emit(f"                f\"Expected type {rel_type!r}, "
+                         "got '{d['type']}'\")")
+            emit("")
+            emit("")
+        emit("_parsers = {")
+        for ot, fn in parsers:
+            emit(f"    {ot!r}: {fn},")
+        emit("}")
+        emit("")
+        emit("")
+        emit("def check_fields(out, ot, attrs, rels):")
+        emit("    p = _parsers.get(ot)")
+        emit("    if p is None:")
+        emit("        raise ValidationError(f\"Unknown type '{ot}'\")")
+        emit("    p(out, attrs, rels)")
+        emit("")
+        emit("")
+        emit("def parse_one(obj):")
+        for attr in ("relationships", "attributes", "links", "meta"):
+            emit(f"    if {attr!r} in obj:")
+            emit(f"        obj['.{attr}'] = obj.pop({attr!r})")
+        emit("    rels = obj.get('.relationships', {})")
+        emit("    attrs = obj.get('.attributes', {})")
+        emit("    obj.update(rels)")
+        emit("    obj.update(attrs)")
+        emit("    check_fields(obj, obj[\"type\"], attrs, rels)")
+        emit("")
+        return "\n".join(lines)
+
+    def _emit_check(self, emit, ind, expr, f_type, var="v"):
+        # Emits a check of var against built-in validator f_type, found in
+        # the namespace as expr, leaving the validated value in var. When a
+        # check fails, the validator itself is called to raise the error.
+        kind = type(f_type)
+        if kind is Type:
+            emit(f"{ind}if not isinstance({var}, {expr}.type_):")
+            emit(f"{ind}    {expr}({var})")
+        elif kind is Int:
+            emit(f"{ind}if type({var}) is not int:")
+            emit(f"{ind}    {expr}({var})")
+        elif kind is Float:
+            emit(f"{ind}if type({var}) is int:")
+            emit(f"{ind}    {var} = float({var})")
+            emit(f"{ind}elif type({var}) is not float:")
+            emit(f"{ind}    {expr}({var})")
+        elif kind is Enum:
+            emit(f"{ind}if type({var}) not in {expr}._types or "
+                 f"{var} not in {expr}.values:")
+            emit(f"{ind}    {expr}({var})")
+        elif kind is Optional:
+            emit(f"{ind}if {var} is not None:")
+            self._emit_check(emit, ind + "    ", f"{expr}.inner",
+                             f_type.inner, var)
+        elif kind is ListOf and f_type._same:
+            emit(f"{ind}if type({var}) is not list:")
+            emit(f"{ind}    {expr}({var})")
+            emit(f"{ind}for e in {var}:")
+            self._emit_check(emit, ind + "    ", f"{expr}.inner",
+                             f_type.inner, "e")
+        else:
+            emit(f"{ind}{var} = {expr}({var})")
+
+    def _codegen(self, cache_dir):
+        ns, names, digest = self._codegen_names()
+        if cache_dir is None:
+            self._source = self._codegen_source(names)
+            code = compile(self._source, f"<qdjarv {digest}>", "exec")
+            exec(code, ns)
+            return ns["parse_one"], ns["check_fields"]
+
+        # Going through the import machinery gets us .pyc caching for free.
+        path = os.path.join(cache_dir, f"qdjarv_{digest}.py")
+        if os.path.exists(path):
+            with open(path) as f:
+                self._source = f.read()
+        else:
+            self._source = self._codegen_source(names)
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(self._source)
+            os.replace(tmp, path)
+        spec = importlib.util.spec_from_file_location(
+            f"qdjarv_{digest}", path)
+        module = importlib.util.module_from_spec(spec)
+        module.__dict__.update(ns)
+        spec.loader.exec_module(module)
+        return module.parse_one, module.check_fields
+
+    def generated_source(self):
+        return self._source
+
+    def fingerprint(self):
+        # Digest of everything that affects validation. Custom validators
+        # are only told apart by their qualified names.
+        types = [(ot, [(f, _validator_key(v)) for f, v in o_fields.items()])
+                 for ot, o_fields in self.types.items()]
+        fields = sorted((k, list(v)) for k, v in self.fields.items())
+        state = (repr(self.top), types, repr(self.include), fields)
+        return hashlib.sha1(repr(state).encode()).hexdigest()
 
     def fields_args(self):
         return [f"fields[{k}]={','.join(vs)}" for k, vs in self.fields.items()]
@@ -36,6 +1174,73 @@ class Validator:
             res += self.include_args(v, f"{pfx}{k}.")
         return res
 
+    # Fields filter for the top type and every type reachable through
+    # include: the relationships include follows, plus everything the
+    # validator checks. Types in accessed get only the fields listed there
+    # instead, which this validator may then find missing, so pass such a
+    # result to a new validator's fields, or use narrow.
+    def derive_fields(self, accessed=None):
+        accessed = accessed if accessed is not None else {}
+        needed = {}
+        for path, ot, spec in self._include_paths():
+            needed.setdefault(ot, set()).update(spec)
+
+        res = {}
+        for ot, rels in needed.items():
+            o_fields = self.types[ot]
+            if ot in accessed:
+                wanted = set(accessed[ot])
+                for f in wanted:
+                    if f not in o_fields:
+                        raise ValueError(f"Type {ot} has no field {f}")
+            else:
+                plan = self._plan[ot]
+                wanted = {f for f, _ in plan.attrs + plan.rels}
+            res[ot] = [f for f in o_fields if f in wanted or f in rels]
+        return res
+
+    def _include_paths(self):
+        # (relationship path, type, include subtree) for every place in the
+        # include tree, starting with the top type.
+        top = self.top[0] if isinstance(self.top, list) else self.top
+        res = []
+        todo = [((), top, self.include)]
+        while todo:
+            path, ot, inc = todo.pop()
+            res.append((path, ot, inc))
+            o_fields = self.types[ot]
+            for k, v in inc.items():
+                f_type = o_fields.get(k)
+                if not isinstance(f_type, Rel):
+                    raise ValueError(f"Include {k} is not a relationship "
+                                     f"of {ot}")
+                rt = f_type.type_
+                todo.append((path + (k,), rt[0] if isinstance(rt, list)
+                             else rt, v))
+        return res
+
+    # The same validator, but asking for and checking only the accessed
+    # fields of the types listed, so its query_string fetches less and
+    # still gets messages it accepts.
+    def narrow(self, accessed):
+        state = self.__getstate__()
+        state["fields"] = self.derive_fields(accessed)
+        return Validator(**state)
+
+    # Encoded include and fields parameters, worked out once per validator.
+    def query_string(self):
+        query = self._query
+        if query is None:
+            params = []
+            include = self.include_args()
+            if include:
+                params.append(("include", ",".join(include)))
+            for ot, fs in self.derive_fields().items():
+                params.append((f"fields[{ot}]", ",".join(fs)))
+            query = urllib.parse.urlencode(params, safe=",")
+            self._query = query
+        return query
+
     def _check_is_list(self, spec, item):
         is_list = isinstance(spec, list)
         should_be_list = isinstance(item, list)
@@ -74,32 +1279,36 @@ class Validator:
 
     def _parse_one(self, obj):
         self._flatten_object(obj)
-        ot = obj["type"]
-        if ot not in self.types:
-            raise ValidationError(f"Unknown type '{ot}'")
+        self._check_one(obj)
 
-        f_filter = self.fields.get(ot)
-        o_fields = self.types[ot]
-        for f, f_type in o_fields.items():
-            if f_filter is not None and f not in f_filter:
-                continue
-            self._validate_field(obj, f, f_type)
+    def _check_one(self, obj):
+        self._check_fields(obj, obj["type"], obj.get(".attributes", {}),
+                           obj.get(".relationships", {}))
 
-    def _validate_field(self, obj, f, f_type):
-        if isinstance(f_type, Rel):
-            self._validate_rel(obj, f, f_type)
-        else:
-            self._validate_attr(obj, f, f_type)
+    def _check_fields(self, out, ot, attrs, rels):
+        # Validated attribute values are written to out.
+        plan = self._plan.get(ot)
+        if plan is None:
+            raise ValidationError(f"Unknown type '{ot}'")
 
-    def _validate_rel(self, obj, f, f_type):
-        ot = obj["type"]
-        f_data = obj.get(".relationships", {}).get(f)
+        for f, f_type in plan.attrs:
+            self._validate_attr(out, ot, attrs, f, f_type)
+        for f, f_type in plan.rels:
+            self._validate_rel(out, ot, rels, f, f_type)
+
+    def _validate_rel(self, out, ot, rels, f, f_type):
+        f_data = rels.get(f)
         if f_data is None:
+            if isinstance(f_type, Nullable):
+                out[f] = {"data": None}
+                return
             raise ValidationError(f"Relationship '{f}' not found for '{ot}'")
         if "data" not in f_data:
             return
 
         data = f_data["data"]
+        if data is None and isinstance(f_type, Nullable):
+            return
         if self._check_is_list(f_type.type_, data):
             rel_type = f_type.type_[0]
             for d in data:
@@ -114,83 +1323,988 @@ class Validator:
                 raise ValidationError(
                     f"Expected type '{rel_type}', got '{data['type']}'")
 
-    def _validate_attr(self, obj, f, f_type):
-        ot = obj["type"]
-        if ".attributes" not in obj or f not in obj[".attributes"]:
+    def _validate_attr(self, out, ot, attrs, f, f_type):
+        if f not in attrs:
+            if type(f_type) is Optional:
+                out[f] = None
+                return
             raise ValidationError(f"Field '{f}' not found for '{ot}'")
-        f_data = obj[".attributes"][f]
-        obj[f] = f_type(f_data)
+        out[f] = f_type(attrs[f])
 
-    def _link(self, objs):
+    def _link(self, objs, store=None):
+        # Returns the index, the references it couldn't resolve, keyed like
+        # the index, for extending the document later, and backlinks if
+        # asked for.
         obj_dict = {
             (obj["id"], obj["type"]): obj
             for obj in objs
         }
+        if store is not None:
+            obj_dict = _StoreIndex(obj_dict, store._objects)
+        dangling = {}
+        backlinks = {} if self.backlinks else None
         for obj in objs:
-            self._link_one(obj, obj_dict)
+            self._link_one(obj, obj_dict, dangling, backlinks)
+        return obj_dict, dangling, backlinks
 
-    def _link_one(self, obj, obj_dict):
+    def _link_one(self, obj, obj_dict, dangling, backlinks=None):
         if ".relationships" not in obj:
             return
 
-        def lookup(ref):
-            if ref is None:
-                return ref
-            key = (ref["id"], ref["type"])
-            return obj_dict.get(key, ref)
-
-        for rel, v in obj[".relationships"].items():
+        for name, v in obj[".relationships"].items():
             if "data" not in v:
                 continue
-            if isinstance(v["data"], list):
-                v["data"] = [lookup(d) for d in v["data"]]
+            data = v["data"]
+            if isinstance(data, list):
+                refs = enumerate(data)
+            elif data is not None:
+                refs = (("data", data),)
+                data = v
             else:
-                v["data"] = lookup(v["data"])
+                continue
+            # data is now the container holding the references.
+            for pos, ref in refs:
+                key = (ref["id"], ref["type"])
+                if backlinks is not None:
+                    backlinks.setdefault((key[1], key[0]), []).append(
+                        (obj, name))
+                found = obj_dict.get(key)
+                if found is None:
+                    dangling.setdefault(key, []).append((data, pos))
+                else:
+                    data[pos] = found
 
-    def _verify_includes(self, data):
-        self._verify_includes_rec(data, self.include)
+    def _verify_includes(self, data, errors=None, ptrs=None, include=None):
+        # Each (resource, include subtree) pair is checked once, no matter
+        # how many include paths lead to it. Done with a stack, since include
+        # trees and chains of resources can be deep.
+        def fail(obj, f):
+            if errors is None:
+                raise ValidationError(f"Field {f} was not included")
+            errors.add(ptrs.get(id(obj), "") + _pointer("relationships", f),
+                       obj, f, f"Field {f} was not included")
 
-    def _verify_includes_rec(self, obj, spec):
-        if isinstance(obj, list):
-            for o in obj:
-                self._verify_includes_rec(o, spec)
-        else:
+        seen = set()
+        stack = [(data, self.include if include is None else include)]
+        while stack:
+            obj, spec = stack.pop()
+            if isinstance(obj, list):
+                stack.extend((o, spec) for o in obj)
+                continue
+            key = (id(obj), id(spec))
+            if key in seen:
+                continue
+            seen.add(key)
             # Assume all include fields are verified as present.
             for f, sub in spec.items():
                 if f not in obj or "data" not in obj[f]:
-                    raise ValidationError(f"Field {f} was not included")
+                    if (obj["type"], f) not in self._nullable:
+                        fail(obj, f)
+                    continue
                 data = obj[f]["data"]
                 if data is None:    # Null one-to-one rel
-                    return
+                    continue
                 if isinstance(data, list):
                     to_check = data
                 else:
                     to_check = [data]
                 for d in to_check:
-                    if set(d.keys()) == {"id", "type"}:
-                        raise ValidationError(f"Field {f} was not included")
-                self._verify_includes_rec(data, sub)
+                    if len(d) == 2 and "id" in d and "type" in d:
+                        fail(obj, f)
+                        break
+                    if sub:
+                        stack.append((d, sub))
 
-    def validate(self, message):
-        all_objects = []
+    def _view_one(self, raw, index):
+        ot = raw["type"]
+        attrs = raw.get("attributes", {})
+        if self.lazy:
+            return self._lazy_view_one(raw, index, ot, attrs)
+        values = {}
+        self._check_fields(values, ot, attrs, raw.get("relationships", {}))
+        # Only keep values that validators replaced, the rest are in attrs.
+        values = {k: v for k, v in values.items()
+                  if k not in attrs or v is not attrs[k]}
+        return ResourceView(raw, values, index)
+
+    def _lazy_view_one(self, raw, index, ot, attrs):
+        # Check everything but attribute values, those are validated by the
+        # view when first read.
+        plan = self._plan.get(ot)
+        if plan is None:
+            raise ValidationError(f"Unknown type '{ot}'")
+        for f, f_type in plan.attrs:
+            if f not in attrs and type(f_type) is not Optional:
+                raise ValidationError(f"Field '{f}' not found for '{ot}'")
+        rels = raw.get("relationships", {})
+        values = {}
+        for f, f_type in plan.rels:
+            self._validate_rel(values, ot, rels, f, f_type)
+        return ResourceView(raw, values, index, self._lazy_attrs[ot])
+
+    def ensure_valid(self, result):
+        # Forces validation of everything lazy mode left for later.
+        for key in ("data", "included"):
+            d = result.get(key)
+            if isinstance(d, ResourceView):
+                d.ensure_valid()
+            elif d is not None:
+                for v in d:
+                    v.ensure_valid()
+        return result
+
+    def _view_all(self, message, stats=None):
+        result = dict(message)
+        index = {}
+        all_views = []
+        view_one = self._view_one
+        if self.sampling:
+            view_one = self._sampled(view_one, self._view_unchecked, stats)
 
         if "data" in message:
             d = message["data"]
             self._validate_top(d)
             if isinstance(d, list):
-                for v in d:
-                    self._parse_one(v)
-                all_objects += d
+                result["data"] = [view_one(v, index) for v in d]
+                all_views += result["data"]
             else:
-                self._parse_one(d)
-                all_objects.append(d)
+                result["data"] = view_one(d, index)
+                all_views.append(result["data"])
 
         if "included" in message:
             d = message["included"]
-            for v in d:
+            result["included"] = [view_one(v, index) for v in d]
+            all_views += result["included"]
+        return result, all_views, index
+
+    def _link_views(self, all_views, index):
+        for v in all_views:
+            index[(v["id"], v["type"])] = v
+
+    def _extend(self, doc, included):
+        if self.slots:
+            raise ValueError("Slots resources can't be extended")
+        index = doc._index
+        if self.views:
+            new = [self._view_one(v, index) for v in included]
+            self._link_views(new, index)
+        else:
+            new = list(included)
+            for v in new:
                 self._parse_one(v)
+            if self.tracker is not None:
+                new = [_TrackedResource(v) for v in new]
+            dangling = doc._dangling
+            for v in new:
+                key = (v["id"], v["type"])
+                index[key] = v
+                for container, pos in dangling.pop(key, ()):
+                    container[pos] = v
+            for v in new:
+                self._link_one(v, index, dangling, doc.backlinks)
+            if self.compact:
+                self._compact(new, doc._rel_names)
+            if self.tracker is not None:
+                self._start_tracking(new)
+        if not self.drop_included:
+            if "included" in doc:
+                doc["included"] += new
+            else:
+                doc["included"] = new
+        return new
+
+    def _apply(self, doc, update):
+        if self.slots or self.views:
+            raise ValueError("Slots and views resources can't be updated")
+        data = update.get("data")
+        if not isinstance(data, dict):
+            raise ValidationError("Expected a single resource")
+        new = [data] + list(update.get("included", ()))
+        for v in new:
+            self._parse_one(v)
+
+        # Link and check includes against the document before changing
+        # anything, so a bad update leaves it as it was. Only places in the
+        # include tree where updated resources sit are checked again.
+        index = doc._index
+        staged = {(v["id"], v["type"]): v for v in new}
+        for v in new:
+            self._link_one(v, ChainMap(staged, index), {})
+        referrers = self._referrers(doc)
+        for path, ot, spec in self._include_paths():
+            if not spec:
+                continue
+            for v in new:
+                old = index.get((v["id"], v["type"]))
+                if v["type"] == ot and self._reached(doc, old, path,
+                                                     referrers):
+                    self._verify_includes(v, include=spec)
+
+        dangling = doc._dangling
+        backlinks = doc.backlinks
+        updated = []
+        added = []
+        for v in new:
+            key = (v["id"], v["type"])
+            old = index.get(key)
+            if old is not None:
+                self._unlink(old, dangling, backlinks)
+                old.clear()
+                old.update(v)
+                updated.append(old)
+                continue
+            if self.tracker is not None:
+                v = _TrackedResource(v)
+            index[key] = v
+            for container, pos in dangling.pop(key, ()):
+                container[pos] = v
+            updated.append(v)
+            added.append(v)
+        # Links made above might point at the staged resources, redo them.
+        for v in updated:
+            self._link_one(v, index, dangling, backlinks)
+        if self.compact:
+            self._compact(updated, doc._rel_names)
+        if self.tracker is not None:
+            self._start_tracking(added)
+        if added and not self.drop_included:
+            if "included" in doc:
+                doc["included"] += added
+            else:
+                doc["included"] = added
+        return updated[0]
+
+    def _rel_items(self, obj):
+        # Relationships of a validated resource, read without going through
+        # tracking, and with or without .relationships kept.
+        plan = self._plan[dict.__getitem__(obj, "type")]
+        for f, _ in plan.rels:
+            rel = dict.get(obj, f)
+            if rel is not None:
+                yield f, rel
+
+    def _referrers(self, doc):
+        # Looks up who refers to a resource, with the document's backlinks
+        # if it has them, or ones worked out when first needed.
+        backlinks = doc.backlinks
+
+        def referrers(obj):
+            nonlocal backlinks
+            if backlinks is None:
+                backlinks = {}
+                for r in doc._index.values():
+                    for name, rel in self._rel_items(r):
+                        for d in _refs({name: rel}):
+                            backlinks.setdefault(
+                                (d["type"], d["id"]), []).append((r, name))
+            return backlinks.get((obj["type"], obj["id"]), ())
+        return referrers
+
+    def _reached(self, doc, obj, path, referrers):
+        # Whether obj can be got to from top data by following path.
+        if obj is None:
+            return False
+        if not path:
+            data = doc.get("data")
+            if isinstance(data, list):
+                return any(d is obj for d in data)
+            return data is obj
+        *rest, f = path
+        return any(name == f and self._reached(doc, r, rest, referrers)
+                   for r, name in referrers(obj))
+
+    def _unlink(self, obj, dangling, backlinks):
+        # Forgets what obj referred to, before it's replaced.
+        containers = set()
+        for name, rel in self._rel_items(obj):
+            containers.add(id(rel))
+            if isinstance(rel.get("data"), list):
+                containers.add(id(rel["data"]))
+            for d in _refs({name: rel}):
+                key = (d["id"], d["type"])
+                if _is_ref(d) and key in dangling:
+                    left = [(c, pos) for c, pos in dangling[key]
+                            if id(c) not in containers]
+                    if left:
+                        dangling[key] = left
+                    else:
+                        del dangling[key]
+                bkey = (d["type"], d["id"])
+                if backlinks is not None and bkey in backlinks:
+                    left = [(r, n) for r, n in backlinks[bkey]
+                            if r is not obj]
+                    if left:
+                        backlinks[bkey] = left
+                    else:
+                        del backlinks[bkey]
+
+    def _intern(self, message, store):
+        return self._swap(message, store._intern)
+
+    def _track(self, message):
+        return self._swap(message, _TrackedResource)
+
+    def _start_tracking(self, objs):
+        seen = self.tracker._seen
+        for obj in objs:
+            ot = obj["type"]
+            if ot not in seen:
+                seen[ot] = set()
+            obj._seen = seen[ot]
+
+    def _swap(self, message, swap):
+        # Replaces resources in message with swap(resource), before they're
+        # linked.
+        all_objects = []
+        if "data" in message:
+            d = message["data"]
+            if isinstance(d, list):
+                d[:] = [swap(v) for v in d]
+                all_objects += d
+            else:
+                message["data"] = swap(d)
+                all_objects.append(message["data"])
+        if "included" in message:
+            d = message["included"]
+            d[:] = [swap(v) for v in d]
             all_objects += d
+        return all_objects
+
+    def _parse_all(self, message, stats=None):
+        all_objects = []
+        if "data" in message:
+            d = message["data"]
+            self._validate_top(d)
+            if isinstance(d, list):
+                all_objects += d
+            else:
+                all_objects.append(d)
+        if "included" in message:
+            all_objects += message["included"]
+
+        if stats is None:
+            parse_one = self._parse_one
+            if self.sampling:
+                parse_one = self._sampled(parse_one, self._parse_unchecked)
+            for v in all_objects:
+                parse_one(v)
+            return all_objects
+
+        # Observed, it's done in two passes, so that flattening and field
+        # checks are timed apart.
+        for v in all_objects:
+            self._flatten_object(v)
+        stats._lap("flatten")
+        check_one = self._check_one
+        if self.sampling:
+            check_one = self._sampled(check_one, self._unchecked_one, stats)
+        for v in all_objects:
+            check_one(v)
+        stats._lap("check_fields")
+        return all_objects
+
+    def _sampled(self, checked, unchecked, stats=None):
+        # Picks which resources get their fields validated. The first
+        # sample_first of each type always do, then sample_rate of the rest,
+        # by a hash of seed, type and id: the same resource is always picked
+        # or not, but different ones are picked in each message. Picks are
+        # counted in stats.
+        seed = str(self.seed)
+        counts = Counter()
+        picked = stats._checked if stats is not None else Counter()
+        first = self.sample_first or 0
+        rate = self.sample_rate or 0.0
+
+        def parse(obj, *args):
+            ot = obj["type"]
+            n = counts[ot]
+            counts[ot] = n + 1
+            if n < first or rate and _draw(seed, ot, obj["id"]) < rate:
+                picked[ot] += 1
+                return checked(obj, *args)
+            return unchecked(obj, *args)
+        return parse
+
+    def _fill_unsampled(self, out, ot, attrs, rels, errors=None, ptr=None):
+        # Resources sampling skips aren't checked, but still come out like
+        # checked ones: values validators convert are converted (and so
+        # checked), left out Optional and Nullable fields are filled in.
+        convert, optional, nullable = self._unsampled[ot]
+        for f, f_type in convert:
+            try:
+                self._validate_attr(out, ot, attrs, f, f_type)
+            except ValidationError as e:
+                if errors is None:
+                    raise
+                errors.add(ptr + _pointer("attributes", f), out, f, e)
+        for f in optional:
+            if f not in attrs:
+                out[f] = None
+        for f in nullable:
+            if f not in rels:
+                out[f] = {"data": None}
+
+    def _parse_unchecked(self, obj):
+        self._flatten_object(obj)
+        self._unchecked_one(obj)
+
+    def _unchecked_one(self, obj):
+        ot = obj["type"]
+        if ot not in self._plan:
+            raise ValidationError(f"Unknown type '{ot}'")
+        self._fill_unsampled(obj, ot, obj.get(".attributes", {}),
+                             obj.get(".relationships", {}))
+
+    def _view_unchecked(self, raw, index):
+        ot = raw["type"]
+        if ot not in self._plan:
+            raise ValidationError(f"Unknown type '{ot}'")
+        values = {}
+        self._fill_unsampled(values, ot, raw.get("attributes", {}),
+                             raw.get("relationships", {}))
+        return ResourceView(raw, values, index)
+
+    def validate(self, message, store=None):
+        if store is not None and (self.views or self.slots or
+                                  self.tracker is not None):
+            raise ValueError("A ResourceStore needs plain dict resources")
+        stats = ValidationStats() if self.observer is not None else None
+        errors = ptrs = index = None
+        if self.views:
+            # Views aren't flattened, checking fields is all there is.
+            message, all_objects, index = self._view_all(message, stats)
+            if stats is not None:
+                stats._lap("check_fields")
+        elif self.max_errors is not None:
+            errors = _Errors(self.max_errors)
+            all_objects, ptrs = self._parse_collect(message, errors, stats)
+        else:
+            all_objects = self._parse_all(message, stats)
+        return self._finish(message, all_objects, store, index, stats,
+                            errors, ptrs)
+
+    def _finish(self, message, all_objects, store=None, index=None,
+                stats=None, errors=None, ptrs=None):
+        # Everything after parsing, whichever way the message came in:
+        # linking, include checks and output. With stats, phases are timed
+        # and the observer called. With errors, include problems go there
+        # too, and all of them are raised at the end.
+        lap = stats._lap if stats is not None else _no_lap
+        dangling = backlinks = None
+        if self.views:
+            self._link_views(all_objects, index)
+            lap("link")
+        else:
+            if store is not None and not errors:
+                all_objects = self._intern(message, store)
+                lap("intern")
+            elif self.tracker is not None:
+                tracked = self._track(message)
+                if ptrs is not None:
+                    ptrs = {id(t): ptrs[id(v)]
+                            for v, t in zip(all_objects, tracked)}
+                all_objects = tracked
+                lap("track")
+            index, dangling, backlinks = self._link(all_objects, store)
+            lap("link")
+        self._verify_includes(message["data"], errors, ptrs)
+        lap("verify_includes")
+        if errors:
+            raise ValidationErrors(list(errors))
+        if stats is not None:
+            self._count_links(stats, all_objects, index)
+        rel_names = None
+        if self.slots:
+            self._to_slots(message, all_objects)
+            lap("slots")
+        elif self.compact:
+            rel_names = {}
+            self._compact(all_objects, rel_names)
+            lap("compact")
+        if self.drop_included:
+            message.pop("included", None)
+        if self.tracker is not None:
+            self._start_tracking(all_objects)
+        if stats is not None:
+            self._observe(stats, all_objects)
+        return Document(message, self, index, dangling, backlinks, rel_names)
+
+    def _count_links(self, stats, all_objects, index):
+        if self.views:
+            for v in all_objects:
+                for ref in _refs(v._raw.get("relationships", {})):
+                    if (ref["id"], ref["type"]) in index:
+                        stats.relationships_linked += 1
+        else:
+            for obj in all_objects:
+                for ref in _refs(obj.get(".relationships", {})):
+                    if not _is_ref(ref):
+                        stats.relationships_linked += 1
+
+    def _observe(self, stats, all_objects):
+        for obj in all_objects:
+            stats.resources[obj["type"]] += 1
+        # Only sampled resources had their fields checked.
+        counts = stats._checked if self.sampling else stats.resources
+        for ot, count in counts.items():
+            plan = self._plan[ot]
+            checked = len(plan.rels)
+            if not self.lazy:
+                checked += len(plan.attrs)
+            stats.fields_checked += count * checked
+        self.observer(stats)
+
+    def _parse_one_collect(self, obj, ptr, errors):
+        self._flatten_object(obj)
+        self._check_one_collect(obj, ptr, errors)
+
+    def _check_one_collect(self, obj, ptr, errors):
+        ot = obj["type"]
+        plan = self._plan.get(ot)
+        if plan is None:
+            errors.add(ptr + "/type", obj, None, f"Unknown type '{ot}'")
+            return
+        attrs = obj.get(".attributes", {})
+        rels = obj.get(".relationships", {})
+        for f, f_type in plan.attrs:
+            try:
+                self._validate_attr(obj, ot, attrs, f, f_type)
+            except ValidationError as e:
+                errors.add(ptr + _pointer("attributes", f), obj, f, e)
+        for f, f_type in plan.rels:
+            try:
+                self._validate_rel(obj, ot, rels, f, f_type)
+            except ValidationError as e:
+                errors.add(ptr + _pointer("relationships", f), obj, f, e)
+
+    def _parse_unchecked_collect(self, obj, ptr, errors):
+        self._flatten_object(obj)
+        self._unchecked_one_collect(obj, ptr, errors)
+
+    def _unchecked_one_collect(self, obj, ptr, errors):
+        ot = obj["type"]
+        if ot not in self._plan:
+            errors.add(ptr + "/type", obj, None, f"Unknown type '{ot}'")
+            return
+        self._fill_unsampled(obj, ot, obj.get(".attributes", {}),
+                             obj.get(".relationships", {}), errors, ptr)
+
+    def _collector(self, errors, ptrs, stats=None, flatten=True):
+        # Returns collect(resource, pointer, is_data), which parses one
+        # resource like _parse_one, but adds what's wrong with it to errors
+        # instead of raising, and remembers its pointer in ptrs. Without
+        # flatten, resources have to be flattened already.
+        top = self.top[0] if isinstance(self.top, list) else self.top
+        if flatten:
+            parse_one = self._parse_one_collect
+            unchecked = self._parse_unchecked_collect
+        else:
+            parse_one = self._check_one_collect
+            unchecked = self._unchecked_one_collect
+        if self.sampling:
+            parse_one = self._sampled(parse_one, unchecked, stats)
+
+        def collect(v, ptr, is_data):
+            if is_data and v["type"] != top:
+                errors.add(ptr + "/type", v, None,
+                           f"Expected {self.top}, but top has type "
+                           f"{v['type']}")
+            parse_one(v, ptr, errors)
+            ptrs[id(v)] = ptr
+        return collect
+
+    def _check_top_collect(self, d, errors):
+        try:
+            return self._check_is_list(self.top, d)
+        except ValidationError as e:
+            errors.add("/data", {}, None, e)
+            return isinstance(d, list)
+
+    def _parse_collect(self, message, errors, stats=None):
+        # Like _parse_all, but goes on after errors, collecting them.
+        items = []
+        if "data" in message:
+            d = message["data"]
+            is_list = self._check_top_collect(d, errors)
+            for i, v in enumerate(d if is_list else [d]):
+                items.append((v, _pointer("data", i) if is_list else "/data",
+                              True))
+        if "included" in message:
+            for i, v in enumerate(message["included"]):
+                items.append((v, _pointer("included", i), False))
+
+        # Observed, flattening is a pass and a phase of its own, like in
+        # _parse_all.
+        if stats is not None:
+            for v, _, _ in items:
+                self._flatten_object(v)
+            stats._lap("flatten")
+        ptrs = {}
+        collect = self._collector(errors, ptrs, stats, flatten=stats is None)
+        for item in items:
+            collect(*item)
+        if stats is not None:
+            stats._lap("check_fields")
+        return [v for v, _, _ in items], ptrs
+
+    async def iter_pages(self, first_page, fetch, max_in_flight=2,
+                         store=None, executor=None):
+        # Follows links.next from first_page, calling the async fetch(url)
+        # for each next page, and yields validated resources from data. Up to
+        # max_in_flight pages are fetched ahead while a page is validated.
+        # Validation runs in executor if one is given.
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        # Held for each page fetched, or being fetched, and not yet taken
+        # for validation.
+        ahead = asyncio.Semaphore(max_in_flight)
+
+        async def produce():
+            page = first_page
+            try:
+                while page is not None:
+                    queue.put_nowait(page)
+                    url = (page.get("links") or {}).get("next")
+                    if url is None:
+                        break
+                    await ahead.acquire()
+                    page = await fetch(url)
+            except Exception as e:
+                queue.put_nowait(_FetchFailed(e))
+            else:
+                queue.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        fetched = False
+        try:
+            while True:
+                page = await queue.get()
+                if page is None:
+                    break
+                if isinstance(page, _FetchFailed):
+                    raise page.exc
+                # All but the first page were fetched.
+                if fetched:
+                    ahead.release()
+                fetched = True
+                if executor is None:
+                    res = self.validate(page, store)
+                else:
+                    res = await loop.run_in_executor(
+                        executor, self.validate, page, store)
+                data = res.get("data")
+                if isinstance(data, list):
+                    for v in data:
+                        yield v
+                elif data is not None:
+                    yield data
+        finally:
+            producer.cancel()
+
+    def validate_many(self, messages, workers=None, chunksize=1):
+        # Validates messages in a pool of worker processes, each holding its
+        # own copy of this validator. Results come back in order, as plain
+        # dicts (not Documents, those don't survive the trip back), with the
+        # exception raised in place of each message that failed.
+        if workers == 1:
+            return [_validate_or_error(self, m) for m in messages]
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(self,)) as pool:
+            return list(pool.imap(_validate_in_worker, messages, chunksize))
+
+    def validate_columns(self, message, numpy=False):
+        # Validates a message with a list top type and returns its resources
+        # as columns, {type: {field: values}}, for the top type and every
+        # included one. Relationship columns hold related ids. With numpy,
+        # columns are arrays, typed for Type(int), Type(float), Type(bool).
+        if not isinstance(self.top, list):
+            raise ValueError("Columns need a list top type")
+        if numpy:
+            import numpy as np
+        res = self.validate(message)
+
+        by_type = {self.top[0]: []}
+        for r in res["data"]:
+            by_type[self.top[0]].append(r)
+        for r in res.get("included", ()):
+            by_type.setdefault(r["type"], []).append(r)
+
+        tables = {}
+        for ot, rs in by_type.items():
+            plan = self._plan[ot]
+            cols = {"id": [r["id"] for r in rs]}
+            for f, f_type in plan.attrs:
+                cols[f] = [r[f] for r in rs]
+            for f, f_type in plan.rels:
+                cols[f] = [_related_ids(r[f]) for r in rs]
+            if numpy:
+                dtypes = {f: _numpy_dtype(f_type) for f, f_type in plan.attrs}
+                cols = {f: _numpy_column(np, v, dtypes.get(f))
+                        for f, v in cols.items()}
+            tables[ot] = cols
+        return tables
+
+    def validate_json(self, raw, store=None):
+        # Decodes and validates a message. The message is decoded with orjson
+        # if available, json if not. orjson is stricter: it rejects NaN and
+        # Infinity, and integers that don't fit in 64 bits.
+        return self.validate(_loads(raw), store)
+
+    def validate_stream(self, fp, chunk_size=65536):
+        # Like validate, but reads the message from a file object (text or
+        # bytes) and validates resources from data and included as soon as
+        # they're parsed.
+        stats = ValidationStats() if self.observer is not None else None
+        message = {}
+        all_objects = []
+        errors = ptrs = index = None
+        if self.max_errors is not None:
+            errors = _Errors(self.max_errors)
+            ptrs = {}
+            collect = self._collector(errors, ptrs, stats)
+            positions = Counter()
+
+            def parse(v, key):
+                i = positions[key]
+                positions[key] = i + 1
+                collect(v, _pointer(key, i), key == "data")
+                return v
+        elif self.views:
+            index = {}
+            view_one = self._view_one
+            if self.sampling:
+                view_one = self._sampled(view_one, self._view_unchecked,
+                                         stats)
+
+            def parse(v, key):
+                if key == "data":
+                    self._validate_top([v])
+                return view_one(v, index)
+        else:
+            parse_one = self._parse_one
+            if self.sampling:
+                parse_one = self._sampled(parse_one, self._parse_unchecked,
+                                          stats)
+
+            def parse(v, key):
+                if key == "data":
+                    self._validate_top([v])
+                parse_one(v)
+                return v
+
+        events = _stream.iter_document(fp, ("data", "included"), chunk_size)
+        for event, key, v in events:
+            if key not in ("data", "included"):
+                message[key] = v
+            elif event == "start":
+                if key == "data":
+                    if errors is None:
+                        self._check_is_list(self.top, [])
+                    else:
+                        self._check_top_collect([], errors)
+                message[key] = []
+            elif event == "item":
+                v = parse(v, key)
+                message[key].append(v)
+                all_objects.append(v)
+            elif key == "data":
+                # A single resource, its top type is checked here.
+                if errors is None:
+                    self._validate_top(v)
+                    v = parse(v, "")
+                elif not self._check_top_collect(v, errors):
+                    v = parse(v, key)
+                message[key] = v
+                all_objects.append(v)
+            else:
+                message[key] = v = [parse(o, key) for o in v]
+                all_objects += v
+
+        if stats is not None:
+            stats._lap("parse")
+        return self._finish(message, all_objects, index=index, stats=stats,
+                            errors=errors, ptrs=ptrs)
+
+
+def _validate_or_error(validator, message):
+    # A malformed message can fail with more than ValidationError, it
+    # shouldn't take the rest of the batch with it.
+    try:
+        return dict(validator.validate(message))
+    except Exception as e:
+        return e
+
+
+_worker_validator = None
+
+
+def _init_worker(validator):
+    global _worker_validator
+    _worker_validator = validator
 
-        self._link(all_objects)
-        self._verify_includes(message["data"])
+
+def _validate_in_worker(message):
+    return _validate_or_error(_worker_validator, message)
+
+
+def _is_many(d):
+    # In a dump, [type, id] is a single reference, a list of those is many.
+    if not isinstance(d, (list, tuple)):
+        return False
+    return not d or not isinstance(d[0], str)
+
+
+def dump(doc):
+    # Turns a validated message (plain dict resources) into an acyclic form
+    # that json, pickle, msgpack and the like handle quickly. Resources are
+    # stored once, in "resources", without the flattened copies of their
+    # fields, and relationships, data and included refer to them with
+    # [type, id] pairs. load reverses it. Attributes are dumped as they
+    # came, not as validators converted them, so DateTime and the like
+    # don't stop json. Compact documents have no raw attributes left, so
+    # converted values are dumped, and they have to be dumped as the
+    # Document validate returned, it knows which of their fields are
+    # relationships. Resources are read with dict methods, so dumping
+    # tracked ones doesn't count as reading them.
+    get = dict.get
+
+    def ref(obj):
+        if not isinstance(obj, dict):
+            raise TypeError("Only dict resources can be dumped")
+        # Unresolved references stay references.
+        if id(obj) not in seen and not _is_ref(obj):
+            seen.add(id(obj))
+            todo.append(obj)
+        return (get(obj, "type"), get(obj, "id"))
+
+    def rel_items(obj):
+        rels = get(obj, ".relationships")
+        if rels is not None:
+            return rels.items()
+        if rel_names is None:
+            return ()
+        names = rel_names.get((get(obj, "id"), get(obj, "type")), ())
+        return [(name, get(obj, name)) for name in names
+                if dict.__contains__(obj, name)]
+
+    rel_names = getattr(doc, "_rel_names", None)
+    seen = set()
+    todo = []
+    top = {k: v for k, v in doc.items() if k not in ("data", "included")}
+    out = {"top": top}
+    if "data" in doc:
+        d = doc["data"]
+        if isinstance(d, list):
+            out["data"] = [ref(v) for v in d]
+        else:
+            out["data"] = ref(d) if d is not None else None
+    if "included" in doc:
+        out["included"] = [ref(v) for v in doc["included"]]
+
+    resources = []
+    while todo:
+        obj = todo.pop()
+        rels = dict(rel_items(obj))
+        attrs = get(obj, ".attributes", {})
+        entry = {}
+        for k, v in dict.items(obj):
+            if k in rels and v is rels[k]:
+                continue
+            # Raw values only, load validates them again.
+            if k in attrs:
+                continue
+            entry[k] = v
+        if rels or dict.__contains__(obj, ".relationships"):
+            entry[".relationships"] = d_rels = {}
+            for name, rel in rels.items():
+                d_rels[name] = rel = dict(rel)
+                data = rel.get("data")
+                if isinstance(data, list):
+                    rel["data"] = [ref(v) for v in data]
+                elif data is not None:
+                    rel["data"] = ref(data)
+        resources.append(entry)
+    out["resources"] = resources
+    return out
+
+
+def load(data, validator=None):
+    # Rebuilds a message from what dump returned, linked just like validate
+    # left it. With the validator that made it, you get back a Document
+    # that can be extended, and attribute values are validated again, so
+    # they're converted like validate left them. Without, they're raw.
+    index = {}
+    objs = []
+    for entry in data["resources"]:
+        obj = dict(entry)
+        attrs = entry.get(".attributes", {})
+        for k, v in attrs.items():
+            obj.setdefault(k, v)
+        if validator is not None and ".attributes" in entry:
+            ot = obj["type"]
+            for f, f_type in validator._plan[ot].attrs:
+                validator._validate_attr(obj, ot, attrs, f, f_type)
+        if ".relationships" in entry:
+            rels = {}
+            for name, rel in entry[".relationships"].items():
+                rels[name] = rel = dict(rel)
+                obj.setdefault(name, rel)
+            obj[".relationships"] = rels
+        if validator is not None and validator.tracker is not None:
+            obj = _TrackedResource(obj)
+        index[(obj["id"], obj["type"])] = obj
+        objs.append(obj)
+
+    dangling = {}
+    backlinks = {} if validator is not None and validator.backlinks else None
+
+    def lookup(ref):
+        type_, id_ = ref
+        found = index.get((id_, type_))
+        if found is None:
+            return {"type": type_, "id": id_}
+        return found
+
+    for obj in objs:
+        for name, rel in obj.get(".relationships", {}).items():
+            d = rel.get("data")
+            if _is_many(d):
+                rel["data"] = d = [lookup(v) for v in d]
+                refs = enumerate(d)
+            elif d is not None:
+                rel["data"] = d = lookup(d)
+                refs = (("data", d),)
+                d = rel
+            else:
+                continue
+            for pos, v in refs:
+                if backlinks is not None:
+                    backlinks.setdefault((v["type"], v["id"]), []).append(
+                        (obj, name))
+                if _is_ref(v):
+                    key = (v["id"], v["type"])
+                    dangling.setdefault(key, []).append((d, pos))
+
+    message = dict(data["top"])
+    if "data" in data:
+        d = data["data"]
+        if _is_many(d):
+            message["data"] = [lookup(v) for v in d]
+        else:
+            message["data"] = lookup(d) if d is not None else None
+    if "included" in data:
+        message["included"] = [lookup(v) for v in data["included"]]
+    if validator is None:
         return message
+    rel_names = None
+    if validator.compact:
+        rel_names = {}
+        validator._compact(objs, rel_names)
+    if validator.drop_included:
+        message.pop("included", None)
+    if validator.tracker is not None:
+        validator._start_tracking(objs)
+    return Document(message, validator, index, dangling, backlinks,
+                    rel_names)
@@ -0,0 +1,112 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+
+    def _fill(self, want=1):
+        # Reads at least want more characters, or up to EOF, in one go, and
+        # drops what we've consumed, so the buffer only holds unparsed text.
+        chunks = []
+        got = 0
+        while got < want and not self.eof:
+            chunk = self.fp.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk, final=not chunk)
+            chunks.append(chunk)
+            got += len(chunk)
+        self.buf = self.buf[self.pos:] + "".join(chunks)
+        self.pos = 0
+
+    def _error(self, msg):
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def peek(self):
+        while True:
+            buf = self.buf
+            while self.pos < len(buf) and buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(buf):
+                return buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise self._error(f"Expecting '{ch}'")
+        self.pos += 1
+
+    def _truncated(self, e):
+        # Whether decoding failed only because the value isn't all in the
+        # buffer yet. Errors further back won't go away with more input.
+        return (e.pos >= len(self.buf) - 6 or
+                e.msg.startswith("Unterminated string"))
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof or not self._truncated(e):
+                    raise
+                # Double what we have, so a value spanning many chunks is
+                # parsed again only a logarithmic number of times.
+                self._fill(len(self.buf) - self.pos)
+                continue
+            # A number at the very end of the buffer might be cut short.
+            if end == len(self.buf) and not self.eof:
+                self._fill(len(self.buf) - self.pos)
+                continue
+            self.pos = end
+            return value
+
+
+# Yields members of the top-level JSON object read from fp. Arrays under one
+# of stream_keys are yielded element by element, as a ("start", key, None)
+# event followed by ("item", key, element) events. Everything else is yielded
+# whole as ("value", key, value).
+def iter_document(fp, stream_keys, chunk_size):
+    r = _Reader(fp, chunk_size)
+    r.expect("{")
+    if r.peek() == "}":
+        r.pos += 1
+        return
+    while True:
+        key = r.value()
+        if not isinstance(key, str):
+            raise r._error("Expecting property name")
+        r.expect(":")
+        if key in stream_keys and r.peek() == "[":
+            r.pos += 1
+            yield "start", key, None
+            if r.peek() == "]":
+                r.pos += 1
+            else:
+                while True:
+                    yield "item", key, r.value()
+                    if r.peek() == "]":
+                        r.pos += 1
+                        break
+                    r.expect(",")
+        else:
+            yield "value", key, r.value()
+        if r.peek() == "}":
+            r.pos += 1
+            break
+        r.expect(",")
+    if r.peek() != "":
+        raise r._error("Extra data")
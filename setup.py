@@ -12,10 +12,14 @@ setup(name="qdjarv",
       author_email='i.kotrasinsk@gmail.com',
       license='MIT',
       packages=['qdjarv'],
+      extras_require={
+          "numpy": ["numpy"],
+          "orjson": ["orjson"],
+      },
       classifiers=[
           "Programming Language :: Python :: 3",
           "License :: OSI Approved :: MIT License",
           "Operating System :: OS Independent",
       ],
-      python_requires='>=3.6',
+      python_requires='>=3.7',
       )
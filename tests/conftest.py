@@ -0,0 +1,114 @@
+import pytest
+from qdjarv import Type, Rel
+
+
+# The JSON:API spec's example schema and response, shared by tests.
+# Fixtures hand each test its own copy to mutate.
+
+
+@pytest.fixture
+def types():
+    return {
+        "articles": {
+            "title": Type(str),
+            "author": Rel("people"),
+            "comments": Rel(["comments"]),
+        },
+        "people": {
+            "firstName": Type(str),
+            "lastName": Type(str),
+            "twitter": Type(str),
+        },
+        "comments": {
+            "body": Type(str),
+            "author": Rel("people")
+        }
+    }
+
+
+@pytest.fixture
+def include():
+    return {
+        "author": {},
+        "comments": {},
+    }
+
+
+@pytest.fixture
+def response():
+    return {
+      "links": {
+        "self": "http://example.com/articles",
+        "next": "http://example.com/articles?page[offset]=2",
+        "last": "http://example.com/articles?page[offset]=10"
+      },
+      "data": [{
+        "type": "articles",
+        "id": "1",
+        "attributes": {
+          "title": "JSON:API paints my bikeshed!"
+        },
+        "relationships": {
+          "author": {
+            "links": {
+              "self": "http://example.com/articles/1/relationships/author",
+              "related": "http://example.com/articles/1/author"
+            },
+            "data": {"type": "people", "id": "9"}
+          },
+          "comments": {
+            "links": {
+              "self": "http://example.com/articles/1/relationships/comments",
+              "related": "http://example.com/articles/1/comments"
+            },
+            "data": [
+              {"type": "comments", "id": "5"},
+              {"type": "comments", "id": "12"}
+            ]
+          }
+        },
+        "links": {
+          "self": "http://example.com/articles/1"
+        }
+      }],
+      "included": [{
+        "type": "people",
+        "id": "9",
+        "attributes": {
+          "firstName": "Dan",
+          "lastName": "Gebhardt",
+          "twitter": "dgeb"
+        },
+        "links": {
+          "self": "http://example.com/people/9"
+        }
+      }, {
+        "type": "comments",
+        "id": "5",
+        "attributes": {
+          "body": "First!"
+        },
+        "relationships": {
+          "author": {
+            "data": {"type": "people", "id": "2"}
+          }
+        },
+        "links": {
+          "self": "http://example.com/comments/5"
+        }
+      }, {
+        "type": "comments",
+        "id": "12",
+        "attributes": {
+          "body": "I like XML better"
+        },
+        "relationships": {
+          "author": {
+            "data": {"type": "people", "id": "9"}
+          }
+        },
+        "links": {
+          "self": "http://example.com/comments/12"
+        }
+      }]
+    }
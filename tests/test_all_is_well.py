@@ -1,110 +1,8 @@
 from copy import deepcopy
-from qdjarv import Validator, Type, Rel
+from qdjarv import Validator
 
 
-types = {
-    "articles": {
-        "title": Type(str),
-        "author": Rel("people"),
-        "comments": Rel(["comments"]),
-    },
-    "people": {
-        "firstName": Type(str),
-        "lastName": Type(str),
-        "twitter": Type(str),
-    },
-    "comments": {
-        "body": Type(str),
-        "author": Rel("people")
-    }
-}
-
-
-include = {
-    "author": {},
-    "comments": {},
-}
-
-
-response = {
-  "links": {
-    "self": "http://example.com/articles",
-    "next": "http://example.com/articles?page[offset]=2",
-    "last": "http://example.com/articles?page[offset]=10"
-  },
-  "data": [{
-    "type": "articles",
-    "id": "1",
-    "attributes": {
-      "title": "JSON:API paints my bikeshed!"
-    },
-    "relationships": {
-      "author": {
-        "links": {
-          "self": "http://example.com/articles/1/relationships/author",
-          "related": "http://example.com/articles/1/author"
-        },
-        "data": {"type": "people", "id": "9"}
-      },
-      "comments": {
-        "links": {
-          "self": "http://example.com/articles/1/relationships/comments",
-          "related": "http://example.com/articles/1/comments"
-        },
-        "data": [
-          {"type": "comments", "id": "5"},
-          {"type": "comments", "id": "12"}
-        ]
-      }
-    },
-    "links": {
-      "self": "http://example.com/articles/1"
-    }
-  }],
-  "included": [{
-    "type": "people",
-    "id": "9",
-    "attributes": {
-      "firstName": "Dan",
-      "lastName": "Gebhardt",
-      "twitter": "dgeb"
-    },
-    "links": {
-      "self": "http://example.com/people/9"
-    }
-  }, {
-    "type": "comments",
-    "id": "5",
-    "attributes": {
-      "body": "First!"
-    },
-    "relationships": {
-      "author": {
-        "data": {"type": "people", "id": "2"}
-      }
-    },
-    "links": {
-      "self": "http://example.com/comments/5"
-    }
-  }, {
-    "type": "comments",
-    "id": "12",
-    "attributes": {
-      "body": "I like XML better"
-    },
-    "relationships": {
-      "author": {
-        "data": {"type": "people", "id": "9"}
-      }
-    },
-    "links": {
-      "self": "http://example.com/comments/12"
-    }
-  }]
-}
-
-
-def test_all_is_well():
+def test_all_is_well(types, include, response):
     validator = Validator(top=["articles"], types=types, include=include)
     mcopy = deepcopy(response)
 
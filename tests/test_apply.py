@@ -0,0 +1,79 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, ValidationError
+
+
+def person(id_, name):
+    return {
+        "type": "people",
+        "id": id_,
+        "attributes": {"firstName": name, "lastName": "B", "twitter": "c"},
+    }
+
+
+def comment(id_, author_id):
+    return {
+        "type": "comments",
+        "id": id_,
+        "attributes": {"body": "Edited"},
+        "relationships": {
+            "author": {"data": {"type": "people", "id": author_id}},
+        },
+    }
+
+
+def test_apply(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          backlinks=True)
+    doc = validator.validate(deepcopy(response))
+    article = doc["data"][0]
+    author = article["author"]["data"]
+    comment5, comment12 = article["comments"]["data"]
+
+    res = doc.apply({"data": person("9", "Daniel")})
+    assert res is author
+    assert author["firstName"] == "Daniel"
+    assert comment12["author"]["data"] is author
+    assert len(doc["included"]) == 3
+
+    doc.apply({"data": comment("5", "9")})
+    assert comment5["body"] == "Edited"
+    assert comment5["author"]["data"] is author
+    assert ("2", "people") not in doc._dangling
+    assert ("people", "2") not in doc.backlinks
+    assert (comment5, "author") in doc.backlinks[("people", "9")]
+
+    added = doc.apply({"data": comment("20", "9"),
+                       "included": [person("3", "C")]})
+    assert added["author"]["data"] is author
+    assert doc["included"][-2:] == [added, doc._index[("3", "people")]]
+
+    with pytest.raises(ValidationError):
+        doc.apply({"data": person("9", 1)})
+    assert author["firstName"] == "Daniel"
+
+
+def test_apply_includes(types, response):
+    message = deepcopy(response)
+    message["included"].append(person("2", "A"))
+    validator = Validator(top=["articles"], types=types,
+                          include={"comments": {"author": {}}})
+    doc = validator.validate(message)
+    article = doc["data"][0]
+    comment12 = article["comments"]["data"][1]
+
+    # people/7 isn't there, and comments.author has to be included.
+    with pytest.raises(ValidationError):
+        doc.apply({"data": comment("12", "7")})
+    assert comment12["body"] == "I like XML better"
+    assert comment12["author"]["data"]["id"] == "9"
+
+    doc.apply({"data": comment("12", "7"), "included": [person("7", "G")]})
+    assert comment12["author"]["data"]["firstName"] == "G"
+
+    # Articles' authors don't need to be included.
+    update = deepcopy(response["data"][0])
+    update["relationships"]["author"]["data"]["id"] = "8"
+    assert doc.apply({"data": update}) is article
+    assert article["author"]["data"] == {"type": "people", "id": "8"}
+    assert article["comments"]["data"][1] is comment12
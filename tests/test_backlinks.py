@@ -0,0 +1,41 @@
+import json
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, dump, load
+
+
+def split(response):
+    first = deepcopy(response)
+    later = first.pop("included")[1:]
+    first["included"] = [deepcopy(response["included"][0])]
+    return first, later
+
+
+def test_backlinks(types, response):
+    validator = Validator(top=["articles"], types=types,
+                          include={"author": {}}, backlinks=True)
+    first, later = split(response)
+    doc = validator.validate(first)
+    article = doc["data"][0]
+    author = doc["included"][0]
+    assert doc.backlinks[("people", "9")] == [(article, "author")]
+    assert doc.backlinks[("comments", "5")] == [(article, "comments")]
+
+    comment5, comment12 = later
+    doc.extend(later)
+    assert doc.backlinks[("people", "9")] == [(article, "author"),
+                                              (comment12, "author")]
+    assert doc.backlinks[("people", "2")] == [(comment5, "author")]
+    assert author["type"] == "people"
+
+    loaded = load(json.loads(json.dumps(dump(doc))), validator)
+    article = loaded["data"][0]
+    refs = loaded.backlinks[("people", "9")]
+    assert sorted((r["id"], name) for r, name in refs) == [("1", "author"),
+                                                           ("12", "author")]
+    assert any(r is article for r, _ in refs)
+
+    assert Validator(top=["articles"], types=types).validate(
+        deepcopy(response)).backlinks is None
+    with pytest.raises(ValueError):
+        Validator(top=["articles"], types=types, backlinks=True, slots=True)
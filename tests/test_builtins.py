@@ -0,0 +1,153 @@
+import datetime
+import json
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, Rel, ValidationError, Optional, Int, \
+    Float, Enum, ListOf, DateTime, Nullable
+
+
+types = {
+    "events": {
+        "name": Type(str),
+        "note": Optional(Type(str)),
+        "count": Int(),
+        "score": Float(),
+        "state": Enum("open", "closed"),
+        "tags": ListOf(Type(str)),
+        "times": ListOf(DateTime()),
+        "at": DateTime(),
+        "venue": Nullable(Rel("venues")),
+        "guests": Nullable(Rel(["people"])),
+    },
+    "venues": {},
+    "people": {},
+}
+
+
+response = {
+    "data": [{
+        "type": "events",
+        "id": "1",
+        "attributes": {
+            "name": "Launch",
+            "count": 3,
+            "score": 2,
+            "state": "open",
+            "tags": ["a", "b"],
+            "times": ["2024-05-01T10:00:00Z"],
+            "at": "2024-05-01T10:00:00Z",
+        },
+        "relationships": {
+            "guests": {"data": None},
+        },
+    }, {
+        "type": "events",
+        "id": "2",
+        "attributes": {
+            "name": "Party",
+            "note": None,
+            "count": 0,
+            "score": 0.5,
+            "state": "closed",
+            "tags": [],
+            "times": [],
+            "at": "2024-05-01T10:00:00+00:00",
+        },
+        "relationships": {
+            "venue": {"data": {"type": "venues", "id": "1"}},
+            "guests": {"data": []},
+        },
+    }],
+    "included": [{"type": "venues", "id": "1", "attributes": {}}],
+}
+
+
+bad_attrs = [
+    ("count", True),
+    ("count", 1.0),
+    ("score", "1"),
+    ("score", False),
+    ("state", "pending"),
+    ("state", ["open"]),
+    ("tags", ["a", 1]),
+    ("tags", "a"),
+    ("at", "yesterday"),
+    ("at", 1),
+    ("times", ["2024-13-01"]),
+    ("note", 1),
+]
+
+
+@pytest.mark.parametrize("codegen", [False, True])
+def test_builtins(codegen):
+    validator = Validator(top=["events"], types=types,
+                          include={"venue": {}}, codegen=codegen)
+    msg = validator.validate(deepcopy(response))
+    first, second = msg["data"]
+    utc = datetime.timezone.utc
+    assert first["note"] is None and second["note"] is None
+    assert first["score"] == 2.0 and type(first["score"]) is float
+    assert first["at"] == datetime.datetime(2024, 5, 1, 10, tzinfo=utc)
+    assert first["times"] == [first["at"]]
+    # Same string, same datetime.
+    assert first["at"] is first["times"][0]
+    assert first["at"] == second["at"]
+    assert first["venue"] == {"data": None}
+    assert first["guests"]["data"] is None
+    assert second["venue"]["data"] is msg["included"][0]
+
+    for f, value in bad_attrs:
+        bad = deepcopy(response)
+        bad["data"][0]["attributes"][f] = value
+        with pytest.raises(ValidationError):
+            validator.validate(bad)
+
+    bad = deepcopy(response)
+    del bad["data"][1]["attributes"]["count"]
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_builtins_views(lazy):
+    validator = Validator(top=["events"], types=types, views=True,
+                          lazy=lazy)
+    msg = validator.validate(deepcopy(response))
+    first = msg["data"][0]
+    assert first["note"] is None
+    assert type(first["score"]) is float
+    assert first["at"].year == 2024
+    assert first["venue"] == {"data": None}
+    assert "venue" in set(first)
+    assert msg["data"][1]["venue"]["data"]["id"] == "1"
+
+
+@pytest.mark.parametrize("max_errors", [None, 10])
+def test_builtins_columns(max_errors):
+    validator = Validator(top=["events"], types=types, max_errors=max_errors)
+    cols = validator.validate_columns(deepcopy(response))
+    assert cols["events"]["venue"] == [None, "1"]
+    assert cols["events"]["guests"] == [None, []]
+
+
+def test_builtins_fingerprint():
+    def fingerprint(state):
+        return Validator(top="events", types={
+            "events": {"state": state}}).fingerprint()
+
+    assert fingerprint(Enum("a")) == fingerprint(Enum("a"))
+    assert fingerprint(Enum("a")) != fingerprint(Enum("b"))
+    assert fingerprint(ListOf(Int())) != fingerprint(ListOf(Float()))
+    with pytest.raises(TypeError):
+        Nullable(Type(str))
+
+
+def test_builtins_json():
+    validator = Validator(top=["events"], types=types)
+    raw = json.dumps(response).encode()
+    assert validator.validate_json(raw)["data"][1]["state"] == "closed"
+    for f, value in bad_attrs:
+        bad = deepcopy(response)
+        bad["data"][0]["attributes"][f] = value
+        with pytest.raises(ValidationError):
+            validator.validate_json(json.dumps(bad).encode())
@@ -0,0 +1,117 @@
+import json
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, ValidatedCache, ValidationError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hits(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    cache = ValidatedCache(validator)
+    raw = json.dumps(response).encode()
+
+    first = cache.validate(raw)
+    second = cache.validate(raw)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first is not second
+    assert first["data"] is not second["data"]
+    assert first["data"][0] is second["data"][0]
+    assert second["data"][0]["author"]["data"]["firstName"] == "Dan"
+
+    # Callers can't step on each other.
+    first["data"].clear()
+    first["links"] = None
+    assert len(cache.validate(raw)["data"]) == 1
+    assert cache.validate(raw)["links"] == response["links"]
+    with pytest.raises(TypeError):
+        second["data"][0]["title"] = "Changed"
+    with pytest.raises(ValueError):
+        second.extend([])
+
+    cache.validate(json.dumps(response, indent=1))
+    assert cache.misses == 2
+
+
+def test_cache_nested_read_only(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    cache = ValidatedCache(validator)
+    raw = json.dumps(response)
+    first = cache.validate(raw)
+    article = first["data"][0]
+    changes = [
+        lambda: article["author"].__setitem__("data", None),
+        lambda: article["comments"]["data"].append(None),
+        lambda: first["links"].__setitem__("self", "HACKED"),
+        lambda: article[".links"].__setitem__("self", "X"),
+        lambda: article[".attributes"].clear(),
+    ]
+    for change in changes:
+        with pytest.raises(TypeError):
+            change()
+
+    again = cache.validate(raw)
+    assert cache.hits == 1
+    article = again["data"][0]
+    assert article["author"]["data"]["firstName"] == "Dan"
+    assert len(article["comments"]["data"]) == 2
+    assert again["links"] == response["links"]
+    assert article[".links"] == response["data"][0]["links"]
+    assert article["title"] == response["data"][0]["attributes"]["title"]
+    # Copies are the caller's own.
+    links = deepcopy(again["links"])
+    links["self"] = "mine"
+    assert json.loads(json.dumps(again["links"])) == response["links"]
+    assert again["links"]["self"] != "mine"
+
+
+def test_cache_etag_and_fingerprint(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    cache = ValidatedCache(validator)
+    raw = json.dumps(response)
+    cache.validate(raw, etag='"v1"')
+    cache.validate(json.dumps(response, indent=2), etag='"v1"')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    other = deepcopy(types)
+    other["people"]["twitter"] = Type(int)
+    assert Validator(["articles"], other).fingerprint() != \
+        Validator(["articles"], types).fingerprint()
+    assert Validator(["articles"], types).fingerprint() == \
+        Validator(["articles"], deepcopy(types)).fingerprint()
+
+
+def test_cache_eviction(types, response):
+    clock = Clock()
+    validator = Validator(top=["articles"], types=types)
+    cache = ValidatedCache(validator, max_size=2, ttl=10, clock=clock)
+    raws = []
+    for i in range(3):
+        msg = deepcopy(response)
+        msg["data"][0]["id"] = str(i)
+        raws.append(json.dumps(msg))
+
+    for raw in raws:
+        cache.validate(raw)
+    assert len(cache) == 2
+    cache.validate(raws[2])
+    assert cache.hits == 1
+    cache.validate(raws[0])
+    assert cache.misses == 4
+
+    clock.now = 11
+    cache.validate(raws[0])
+    assert cache.misses == 5
+
+    bad = deepcopy(response)
+    bad["data"][0]["attributes"]["title"] = 1
+    for _ in range(2):
+        with pytest.raises(ValidationError):
+            cache.validate(json.dumps(bad))
+    assert cache.misses == 7
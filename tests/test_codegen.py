@@ -0,0 +1,94 @@
+import os
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, ValidationError
+
+
+def test_codegen_all_is_well(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          codegen=True)
+    mcopy = validator.validate(deepcopy(response))
+
+    author_obj = mcopy["data"][0]
+    assert author_obj["title"] == author_obj[".attributes"]["title"]
+    assert author_obj["author"]["data"]["firstName"] == "Dan"
+    assert author_obj["comments"]["data"][0]["body"] == "First!"
+
+    plain = Validator(top=["articles"], types=types, include=include)
+    assert plain.validate(deepcopy(response)).keys() == mcopy.keys()
+    assert plain.generated_source() is None
+
+
+def test_codegen_errors(types, response):
+    validator = Validator(top=["articles"], types=types, codegen=True)
+
+    bad = deepcopy(response)
+    bad["data"][0]["attributes"]["title"] = 1
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    bad = deepcopy(response)
+    del bad["included"][0]["attributes"]["twitter"]
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    bad = deepcopy(response)
+    bad["data"][0]["relationships"]["comments"]["data"][0]["type"] = "people"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    bad = deepcopy(response)
+    bad["data"][0]["relationships"]["author"]["data"] = []
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    bad = deepcopy(response)
+    bad["included"][0]["type"] = "foo"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+
+def test_codegen_custom_validation_and_fields():
+    def upper(v):
+        if not isinstance(v, str):
+            raise ValidationError("Not a string")
+        return v.upper()
+
+    ctypes = {
+        "articles": {
+            "title": upper,
+            "body": Type(str),
+        },
+    }
+    validator = Validator(top="articles", types=ctypes,
+                          fields={"articles": ["title"]}, codegen=True)
+    res = validator.validate({
+        "data": {
+            "type": "articles",
+            "id": "1",
+            "attributes": {"title": "foo"},
+        },
+    })
+    assert res["data"]["title"] == "FOO"
+    assert "'body'" not in validator.generated_source()
+
+
+def test_codegen_cache_dir(tmp_path, types, include, response):
+    cache = tmp_path / "gen"
+    v1 = Validator(top=["articles"], types=types, include=include,
+                   codegen=True, cache_dir=str(cache))
+    files = [f for f in os.listdir(cache) if f.endswith(".py")]
+    assert len(files) == 1
+    with open(cache / files[0]) as f:
+        assert f.read() == v1.generated_source()
+
+    v2 = Validator(top=["articles"], types=types, include=include,
+                   codegen=True, cache_dir=str(cache))
+    assert v2.generated_source() == v1.generated_source()
+    res = v2.validate(deepcopy(response))
+    assert res["data"][0]["author"]["data"]["lastName"] == "Gebhardt"
+
+    other = dict(types, people={"firstName": Type(str)})
+    Validator(top=["articles"], types=other, codegen=True,
+              cache_dir=str(cache))
+    assert len([f for f in os.listdir(cache) if f.endswith(".py")]) == 2
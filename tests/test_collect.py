@@ -0,0 +1,101 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, ValidationError, ValidationErrors
+
+
+def broken(response):
+    bad = deepcopy(response)
+    bad["data"][0]["attributes"]["title"] = 1
+    bad["data"][0]["relationships"]["author"]["data"]["type"] = "comments"
+    del bad["included"][0]["attributes"]["lastName"]
+    bad["included"][1]["attributes"]["body"] = None
+    bad["included"][2]["relationships"]["author"]["data"]["id"] = "10"
+    return bad
+
+
+def test_collect_all_errors(types, response):
+    validator = Validator(top=["articles"], types=types,
+                          include={"comments": {"author": {}}},
+                          max_errors=100)
+    with pytest.raises(ValidationErrors) as e:
+        validator.validate(broken(response))
+    assert isinstance(e.value, ValidationError)
+
+    found = {(d.path, d.type_, d.id_, d.field) for d in e.value.errors}
+    assert found == {
+        ("/data/0/attributes/title", "articles", "1", "title"),
+        ("/data/0/relationships/author", "articles", "1", "author"),
+        ("/included/0/attributes/lastName", "people", "9", "lastName"),
+        ("/included/1/attributes/body", "comments", "5", "body"),
+        # Neither comment author was included.
+        ("/included/1/relationships/author", "comments", "5", "author"),
+        ("/included/2/relationships/author", "comments", "12", "author"),
+    }
+    assert all(d.message for d in e.value.errors)
+
+
+def test_collect_budget(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          max_errors=2)
+    with pytest.raises(ValidationErrors) as e:
+        validator.validate(broken(response))
+    assert [d.path for d in e.value.errors] == [
+        "/data/0/attributes/title", "/data/0/relationships/author"]
+
+
+def test_collect_top_and_ok(types, include, response):
+    validator = Validator(top="articles", types=types, include=include,
+                          max_errors=10)
+    with pytest.raises(ValidationErrors) as e:
+        validator.validate(deepcopy(response))
+    assert [d.path for d in e.value.errors] == ["/data"]
+
+    bad = deepcopy(response)
+    bad["data"][0]["type"] = "people"
+    validator = Validator(top=["articles"], types=types, max_errors=10)
+    with pytest.raises(ValidationErrors) as e:
+        validator.validate(bad)
+    assert e.value.errors[0].path == "/data/0/type"
+
+    validator = Validator(top=["articles"], types=types, include=include,
+                          max_errors=10)
+    msg = validator.validate(deepcopy(response))
+    assert msg["data"][0]["author"]["data"]["firstName"] == "Dan"
+
+    with pytest.raises(ValueError):
+        Validator(top=["articles"], types=types, views=True, max_errors=10)
+
+
+def test_collect_combines(types, include, response):
+    import io
+    import json
+
+    seen = []
+    validator = Validator(top=["articles"], types=types,
+                          include={"comments": {"author": {}}},
+                          max_errors=100, observer=seen.append)
+    stream = io.StringIO(json.dumps(broken(response)))
+    with pytest.raises(ValidationErrors) as e:
+        validator.validate_stream(stream, 16)
+    assert len(e.value.errors) == 6
+    assert "/included/2/relationships/author" in [
+        d.path for d in e.value.errors]
+
+    ok = Validator(top=["articles"], types=types, include=include,
+                   max_errors=100, observer=seen.append)
+    ok.validate(deepcopy(response))
+    assert len(seen) == 1 and seen[0].resources["comments"] == 2
+
+    bad = deepcopy(response)
+    for v in bad["included"]:
+        v["attributes"] = {}
+    sampled = Validator(top=["articles"], types=types, include=include,
+                        max_errors=100, sample_first=1, sample_rate=0)
+    with pytest.raises(ValidationErrors) as e:
+        sampled.validate(bad)
+    assert [d.path for d in e.value.errors] == [
+        "/included/0/attributes/firstName",
+        "/included/0/attributes/lastName",
+        "/included/0/attributes/twitter",
+        "/included/1/attributes/body",
+    ]
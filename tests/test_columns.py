@@ -0,0 +1,84 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, Rel
+
+
+ntypes = {
+    "articles": {
+        "title": Type(str),
+        "views": Type(int),
+        "score": Type(float),
+        "draft": Type(bool),
+        "author": Rel("people"),
+        "tags": Rel(["tags"]),
+    },
+    "people": {},
+    "tags": {},
+}
+
+
+def articles(n):
+    return {
+        "data": [{
+            "type": "articles",
+            "id": str(i),
+            "attributes": {
+                "title": f"Article {i}",
+                "views": i * 10,
+                "score": i / 2,
+                "draft": i % 2 == 0,
+            },
+            "relationships": {
+                "author": {"data": {"type": "people", "id": "9"}},
+                "tags": {"data": [{"type": "tags", "id": "a"},
+                                  {"type": "tags", "id": "b"}]},
+            },
+        } for i in range(n)],
+    }
+
+
+def test_columns(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    tables = validator.validate_columns(deepcopy(response))
+
+    assert set(tables) == {"articles", "people", "comments"}
+    assert tables["articles"] == {
+        "id": ["1"],
+        "title": ["JSON:API paints my bikeshed!"],
+        "author": ["9"],
+        "comments": [["5", "12"]],
+    }
+    assert tables["comments"]["body"] == ["First!", "I like XML better"]
+    assert tables["comments"]["author"] == ["2", "9"]
+
+    validator = Validator(top="articles", types=types)
+    with pytest.raises(ValueError):
+        validator.validate_columns(deepcopy(response))
+
+
+def test_columns_views_and_fields():
+    validator = Validator(top=["articles"], types=ntypes, views=True,
+                          fields={"articles": ["views", "tags"]})
+    tables = validator.validate_columns(articles(3))
+    assert tables == {
+        "articles": {
+            "id": ["0", "1", "2"],
+            "views": [0, 10, 20],
+            "tags": [["a", "b"]] * 3,
+        },
+    }
+
+
+def test_columns_numpy():
+    np = pytest.importorskip("numpy")
+    validator = Validator(top=["articles"], types=ntypes)
+    cols = validator.validate_columns(articles(4), numpy=True)["articles"]
+
+    assert cols["views"].dtype == np.int64
+    assert cols["score"].dtype == np.float64
+    assert cols["draft"].dtype == np.bool_
+    assert cols["title"].dtype == object
+    assert list(cols["views"]) == [0, 10, 20, 30]
+    assert cols["tags"].shape == (4,)
+    assert cols["tags"][0] == ["a", "b"]
+    assert list(cols["author"]) == ["9"] * 4
@@ -0,0 +1,82 @@
+import json
+import pytest
+import sys
+from copy import deepcopy
+from qdjarv import Validator, Document, dump, load
+
+
+def test_compact(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          compact=True)
+    msg = validator.validate(deepcopy(response))
+    article = msg["data"][0]
+    assert set(article) == {"type", "id", ".links", "title", "author",
+                            "comments"}
+    author = article["author"]["data"]
+    assert author is msg["included"][0]
+    assert author["firstName"] == "Dan"
+    assert article["comments"]["data"][1]["author"]["data"] is author
+
+    other = validator.validate(json.loads(json.dumps(response)))
+    assert other["data"][0]["type"] is article["type"]
+    key, = [k for k in other["data"][0] if k == "title"]
+    assert key is sys.intern("title")
+    ref = other["data"][0]["comments"]["data"][0]["author"]["data"]
+    assert ref["type"] is sys.intern("people")
+
+
+def test_compact_drop(types, response):
+    validator = Validator(top=["articles"], types=types,
+                          include={"author": {}}, compact=True, keep=(),
+                          drop_included=True)
+    first = deepcopy(response)
+    later = [first["included"].pop()]
+    msg = validator.validate(first)
+    assert "included" not in msg
+    article = msg["data"][0]
+    assert set(article) == {"type", "id", "title", "author", "comments"}
+
+    msg.extend(later)
+    assert "included" not in msg
+    comment = article["comments"]["data"][1]
+    assert comment["body"] == "I like XML better"
+    assert set(comment) == {"type", "id", "body", "author"}
+    assert comment["author"]["data"] is article["author"]["data"]
+
+    with pytest.raises(ValueError):
+        Validator(top=["articles"], types=types, compact=True, views=True)
+
+
+def test_compact_dump(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          compact=True)
+    doc = validator.validate(deepcopy(response))
+    raw = json.dumps(dump(doc))
+
+    msg = load(json.loads(raw), validator)
+    assert type(msg) is Document
+    article = msg["data"][0]
+    assert set(article) == {"type", "id", ".links", "title", "author",
+                            "comments"}
+    author = article["author"]["data"]
+    assert author is msg["included"][0]
+    assert author["firstName"] == "Dan"
+    assert article["comments"]["data"][1]["author"]["data"] is author
+    assert json.dumps(dump(msg)) == raw
+
+
+def test_compact_dump_undeclared_rel(types, include, response):
+    # people declare no relationships, but this one comes with one anyway.
+    message = deepcopy(response)
+    message["included"][0]["relationships"] = {
+        "articles": {"data": [{"type": "articles", "id": "1"}]}}
+    validator = Validator(top=["articles"], types=types, include=include,
+                          compact=True)
+    doc = validator.validate(message)
+    author = doc["included"][0]
+    assert author["articles"]["data"][0] is doc["data"][0]
+
+    msg = load(json.loads(json.dumps(dump(doc))), validator)
+    author = msg["included"][0]
+    assert author["articles"]["data"][0] is msg["data"][0]
+    assert ".relationships" not in author
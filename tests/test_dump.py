@@ -0,0 +1,74 @@
+import datetime
+import json
+import pickle
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Document, DateTime, Type, dump, load
+
+
+def test_dump_load(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    doc = validator.validate(deepcopy(response))
+    raw = json.dumps(dump(doc))
+
+    msg = load(json.loads(raw))
+    assert type(msg) is dict
+    article = msg["data"][0]
+    author = article["author"]["data"]
+    assert author is msg["included"][0]
+    assert author["firstName"] == "Dan"
+    assert article[".relationships"]["author"] is article["author"]
+    assert article["comments"]["data"][1]["author"]["data"] is author
+    assert article["comments"]["data"][0]["author"]["data"] == {
+        "type": "people", "id": "2"}
+    assert article[".links"] == {"self": "http://example.com/articles/1"}
+    assert msg["links"] == response["links"]
+    assert set(article) == set(doc["data"][0])
+
+    # Dumping again gives the same thing.
+    assert json.dumps(dump(msg)) == raw
+
+    again = load(pickle.loads(pickle.dumps(dump(doc))), validator)
+    assert isinstance(again, Document)
+    again.extend([{
+        "type": "people",
+        "id": "2",
+        "attributes": {"firstName": "A", "lastName": "B", "twitter": "c"},
+    }])
+    comment = again["data"][0]["comments"]["data"][0]
+    assert comment["author"]["data"]["firstName"] == "A"
+
+
+def test_dump_single_and_views(types, response):
+    validator = Validator(top="articles", types=types)
+    single = deepcopy(response)
+    single["data"] = single["data"][0]
+    msg = load(dump(validator.validate(single)))
+    assert msg["data"]["author"]["data"]["lastName"] == "Gebhardt"
+
+    validator = Validator(top=["articles"], types=types, views=True)
+    with pytest.raises(TypeError):
+        dump(validator.validate(response))
+
+
+def test_dump_converted_values():
+    dtypes = {"events": {"name": Type(str), "at": DateTime()}}
+    message = {"data": [{
+        "type": "events",
+        "id": "1",
+        "attributes": {"name": "Launch", "at": "2024-05-01T10:00:00Z"},
+    }]}
+    at = datetime.datetime(2024, 5, 1, 10, tzinfo=datetime.timezone.utc)
+    validator = Validator(top=["events"], types=dtypes)
+    raw = json.dumps(dump(validator.validate(deepcopy(message))))
+
+    assert load(json.loads(raw), validator)["data"][0]["at"] == at
+    assert load(json.loads(raw))["data"][0]["at"] == "2024-05-01T10:00:00Z"
+
+    # Compact documents keep no raw values, converted ones get dumped.
+    validator = Validator(top=["events"], types=dtypes, compact=True)
+    dumped = dump(validator.validate(deepcopy(message)))
+    with pytest.raises(TypeError):
+        json.dumps(dumped)
+    msg = load(pickle.loads(pickle.dumps(dumped)), validator)
+    assert msg["data"][0]["at"] == at
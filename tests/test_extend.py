@@ -0,0 +1,70 @@
+import pickle
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Document, ValidationError
+
+
+def split(response):
+    first = deepcopy(response)
+    later = first.pop("included")[1:]
+    first["included"] = [deepcopy(response["included"][0])]
+    return first, later
+
+
+def test_extend(types, response):
+    validator = Validator(top=["articles"], types=types,
+                          include={"author": {}})
+    first, later = split(response)
+    doc = validator.validate(first)
+    assert isinstance(doc, Document)
+    article = doc["data"][0]
+    assert article["comments"]["data"][0] == {"type": "comments", "id": "5"}
+
+    def more():
+        return [{
+            "type": "people",
+            "id": "2",
+            "attributes": {"firstName": "A", "lastName": "B", "twitter": "c"},
+        }]
+
+    added = doc.extend(later)
+    assert added == later
+    comment = article["comments"]["data"][0]
+    assert comment["body"] == "First!"
+    assert article["comments"]["data"][1]["author"]["data"] is \
+        article["author"]["data"]
+    assert comment["author"]["data"] == {"type": "people", "id": "2"}
+    assert len(doc["included"]) == 3
+
+    doc.extend(more())
+    assert comment["author"]["data"]["firstName"] == "A"
+    assert len(doc["included"]) == 4
+
+    bad = more()
+    bad[0]["attributes"]["firstName"] = 1
+    with pytest.raises(ValidationError):
+        doc.extend(bad)
+
+
+def test_extend_views(types, response):
+    validator = Validator(top=["articles"], types=types,
+                          include={"author": {}}, views=True)
+    first, later = split(response)
+    doc = validator.validate(first)
+    article = doc["data"][0]
+    assert article["comments"]["data"][0] == {"type": "comments", "id": "5"}
+    doc.extend(later)
+    assert article["comments"]["data"][0]["body"] == "First!"
+    assert "included" in first and len(first["included"]) == 1
+
+
+def test_document_is_a_dict(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    doc = validator.validate(deepcopy(response))
+    assert type(pickle.loads(pickle.dumps(doc))) is dict
+    assert type(deepcopy(doc)) is dict
+
+    validator = Validator(top=["articles"], types=types, slots=True)
+    doc = validator.validate(deepcopy(response))
+    with pytest.raises(ValueError):
+        doc.extend([])
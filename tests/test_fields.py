@@ -1,4 +1,5 @@
 import pytest
+from copy import deepcopy
 from qdjarv import Validator, Type, Rel, ValidationError
 
 
@@ -103,3 +104,61 @@ def test_fields_args():
     attrs = validator.fields_args()
     assert set(attrs) == {"fields[articles]=comments",
                           "fields[comments]=foo,bar"}
+
+
+def test_derive_fields(types, include, response):
+    validator = Validator(top=["articles"], types=types,
+                          include={"comments": {"author": {}}})
+    assert validator.derive_fields() == {
+        "articles": ["title", "author", "comments"],
+        "comments": ["body", "author"],
+        "people": ["firstName", "lastName", "twitter"],
+    }
+
+    accessed = {"articles": ["title"], "people": ["twitter"]}
+    assert validator.derive_fields(accessed) == {
+        "articles": ["title", "comments"],
+        "comments": ["body", "author"],
+        "people": ["twitter"],
+    }
+    fields = Validator(top=["articles"], types=types,
+                       include=include).derive_fields(accessed)
+    assert fields["articles"] == ["title", "author", "comments"]
+    narrow = Validator(top=["articles"], types=types, include=include,
+                       fields=fields)
+    narrow.validate(deepcopy(response))
+
+    query = validator.query_string()
+    assert query == ("include=comments,comments.author"
+                     "&fields%5Barticles%5D=title,author,comments"
+                     "&fields%5Bcomments%5D=body,author"
+                     "&fields%5Bpeople%5D=firstName,lastName,twitter")
+    assert validator.query_string() is query
+
+    with pytest.raises(ValueError):
+        validator.derive_fields({"people": ["age"]})
+    with pytest.raises(ValueError):
+        Validator(top="articles", types=types,
+                  include={"title": {}}).derive_fields()
+
+
+def test_narrow(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    accessed = {"articles": ["title"], "people": ["twitter"]}
+    narrow = validator.narrow(accessed)
+    assert narrow.include == validator.include
+    assert narrow.query_string() == (
+        "include=author,comments"
+        "&fields%5Barticles%5D=title,author,comments"
+        "&fields%5Bcomments%5D=body,author"
+        "&fields%5Bpeople%5D=twitter")
+
+    # What the narrowed query fetches.
+    message = deepcopy(response)
+    for obj in [message["data"][0]] + message["included"]:
+        if obj["type"] == "people":
+            obj["attributes"] = {"twitter": obj["attributes"]["twitter"]}
+    msg = narrow.validate(deepcopy(message))
+    assert msg["included"][0]["twitter"] == "dgeb"
+    with pytest.raises(ValidationError):
+        validator.validate(deepcopy(message))
@@ -177,3 +177,61 @@ def test_include_null_field():
     validator = Validator("articles", types, include=include)
     msg = validator.validate(deepcopy(response))
     assert msg["data"]["author"]["data"] is None
+
+
+def test_include_null_field_checks_siblings():
+    types = {
+        "articles": {
+            "author": Rel("people"),
+            "editor": Rel("people"),
+        },
+        "people": {},
+    }
+    include = {
+        "author": {},
+        "editor": {},
+    }
+    response = {
+        "data": {
+            "type": "articles",
+            "id": "1",
+            "relationships": {
+                "author": {"data": None},
+                "editor": {"data": {"type": "people", "id": "1"}},
+            },
+        }
+    }
+    validator = Validator("articles", types, include=include)
+    with pytest.raises(ValidationError):
+        validator.validate(deepcopy(response))
+
+
+def test_deep_include_loop():
+    types = {
+        "nodes": {
+            "next": Rel("nodes"),
+        },
+    }
+    include = {}
+    for _ in range(5000):
+        include = {"next": include}
+
+    response = {
+        "data": {
+            "type": "nodes",
+            "id": "1",
+            "relationships": {
+                "next": {"data": {"type": "nodes", "id": "2"}},
+            },
+        },
+        "included": [{
+            "type": "nodes",
+            "id": "2",
+            "relationships": {
+                "next": {"data": {"type": "nodes", "id": "1"}},
+            },
+        }]
+    }
+    validator = Validator("nodes", types, include=include)
+    msg = validator.validate(deepcopy(response))
+    assert msg["data"]["next"]["data"]["next"]["data"] is msg["data"]
@@ -0,0 +1,33 @@
+import json
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, ValidationError
+
+
+def dumps(message):
+    return json.dumps(message).encode()
+
+
+def test_validate_json(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    msg = validator.validate_json(dumps(response))
+    assert msg["data"][0]["author"]["data"]["firstName"] == "Dan"
+    assert msg["data"][0][".attributes"] == {
+        "title": "JSON:API paints my bikeshed!"}
+    assert msg["links"] == response["links"]
+
+    for bad_attrs in ({"title": 1}, {}):
+        bad = deepcopy(response)
+        bad["data"][0]["attributes"] = bad_attrs
+        with pytest.raises(ValidationError):
+            validator.validate_json(dumps(bad))
+
+    bad = deepcopy(response)
+    bad["included"][2]["relationships"]["author"]["data"]["type"] = "x"
+    with pytest.raises(ValidationError):
+        validator.validate_json(dumps(bad))
+
+    bad = deepcopy(response)
+    del bad["included"][0]
+    with pytest.raises(ValidationError):
+        validator.validate_json(dumps(bad))
@@ -0,0 +1,67 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, ValidationError
+
+
+def counting_types(types):
+    calls = []
+
+    def checked(name):
+        def v(value):
+            calls.append(name)
+            return Type(str)(value)
+        return v
+
+    ctypes = deepcopy(types)
+    ctypes["articles"]["title"] = checked("title")
+    ctypes["people"]["firstName"] = checked("firstName")
+    ctypes["people"]["lastName"] = checked("lastName")
+    return ctypes, calls
+
+
+def test_lazy_validates_on_access(include, response, types):
+    ctypes, calls = counting_types(types)
+    validator = Validator(top=["articles"], types=ctypes, include=include,
+                          lazy=True)
+    msg = validator.validate(response)
+    assert calls == []
+
+    author = msg["data"][0]["author"]["data"]
+    assert author["firstName"] == "Dan"
+    assert author["firstName"] == "Dan"
+    assert calls == ["firstName"]
+
+    validator.ensure_valid(msg)
+    assert sorted(calls) == ["firstName", "lastName", "title"]
+    validator.ensure_valid(msg)
+    assert len(calls) == 3
+
+
+def test_lazy_errors(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          lazy=True)
+
+    bad = deepcopy(response)
+    bad["included"][0]["attributes"]["firstName"] = 1
+    msg = validator.validate(bad)
+    author = msg["included"][0]
+    assert author["lastName"] == "Gebhardt"
+    with pytest.raises(ValidationError):
+        author["firstName"]
+    with pytest.raises(ValidationError):
+        author["firstName"]
+    with pytest.raises(ValidationError):
+        author.ensure_valid()
+    with pytest.raises(ValidationError):
+        validator.ensure_valid(msg)
+
+    # Structure is still checked up front.
+    bad = deepcopy(response)
+    del bad["included"][0]["attributes"]["firstName"]
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    bad = deepcopy(response)
+    bad["data"][0]["relationships"]["author"]["data"]["type"] = "comments"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
@@ -0,0 +1,55 @@
+import pickle
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, ValidationError, Resource
+
+
+def messages(response):
+    bad = deepcopy(response)
+    bad["data"][0]["attributes"]["title"] = 1
+    res = [deepcopy(response) for _ in range(10)]
+    res[3] = bad
+    res[7] = deepcopy(response)
+    del res[7]["included"][1]["type"]
+    return res
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_many(workers, types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    results = validator.validate_many(messages(response), workers=workers,
+                                      chunksize=3)
+    assert len(results) == 10
+    for i, res in enumerate(results):
+        if i == 3:
+            assert isinstance(res, ValidationError)
+        elif i == 7:
+            assert isinstance(res, KeyError)
+        else:
+            assert type(res) is dict
+            assert res["data"][0]["author"]["data"]["firstName"] == "Dan"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_many_slots(workers, types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          slots=True)
+    results = validator.validate_many(messages(response), workers=workers)
+    assert isinstance(results[3], ValidationError)
+    article = results[0]["data"][0]
+    assert isinstance(article, Resource)
+    assert type(article) is type(validator.validate(
+        deepcopy(response))["data"][0])
+    author = article.author["data"]
+    assert author is results[0]["included"][0]
+    assert article.comments["data"][1].author["data"] is author
+    assert author.links == {"self": "http://example.com/people/9"}
+
+
+def test_validator_pickles(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          codegen=True)
+    copy = pickle.loads(pickle.dumps(validator))
+    assert copy.generated_source() == validator.generated_source()
+    res = copy.validate(deepcopy(response))
+    assert res["data"][0]["comments"]["data"][1]["body"] == "I like XML better"
@@ -0,0 +1,57 @@
+from copy import deepcopy
+from qdjarv import Validator, ValidationStats, ResourceStore
+
+
+def test_observer(types, include, response):
+    seen = []
+    validator = Validator(top=["articles"], types=types, include=include,
+                          observer=seen.append)
+    msg = validator.validate(deepcopy(response))
+    assert msg["data"][0]["author"]["data"]["firstName"] == "Dan"
+
+    stats, = seen
+    assert isinstance(stats, ValidationStats)
+    assert list(stats.phases) == ["flatten", "check_fields", "link",
+                                  "verify_includes"]
+    assert all(t >= 0 for t in stats.phases.values())
+    assert stats.total == sum(stats.phases.values())
+    assert stats.resources == {"articles": 1, "people": 1, "comments": 2}
+    # 3 fields for articles and people, 2 for each comment.
+    assert stats.fields_checked == 10
+    # Author, two comments, author of the second comment.
+    assert stats.relationships_linked == 4
+
+    validator.validate(deepcopy(response), store=ResourceStore())
+    assert "intern" in seen[1].phases
+
+
+def test_observer_modes(types, include, response):
+    for options in ({"views": True}, {"lazy": True}, {"slots": True},
+                    {"max_errors": 10}, {"codegen": True}):
+        seen = []
+        validator = Validator(top=["articles"], types=types, include=include,
+                              observer=seen.append, **options)
+        msg = validator.validate(deepcopy(response))
+        assert msg["data"][0]["author"]["data"]["firstName"] == "Dan"
+        stats, = seen
+        assert stats.relationships_linked == 4
+        assert sum(stats.resources.values()) == 4
+        assert ("flatten" in stats.phases) == (not validator.views)
+        assert "check_fields" in stats.phases
+        if "lazy" in options:
+            assert stats.fields_checked == 4
+        else:
+            assert stats.fields_checked == 10
+
+
+def test_observer_sampled(types, include, response):
+    for options in ({}, {"views": True}, {"max_errors": 10}):
+        seen = []
+        validator = Validator(top=["articles"], types=types, include=include,
+                              observer=seen.append, sample_first=1,
+                              sample_rate=0, **options)
+        validator.validate(deepcopy(response))
+        stats, = seen
+        assert sum(stats.resources.values()) == 4
+        # Only the first comment was checked.
+        assert stats.fields_checked == 8
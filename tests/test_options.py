@@ -0,0 +1,88 @@
+import itertools
+import json
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, AccessTracker, Resource, dump, load
+
+
+options = {
+    "views": {"views": True},
+    "lazy": {"views": True, "lazy": True},
+    "slots": {"slots": True},
+    "compact": {"compact": True},
+    "drop_included": {"drop_included": True},
+    "tracker": {"tracker": AccessTracker()},
+    "backlinks": {"backlinks": True},
+    "max_errors": {"max_errors": 10},
+    "sampling": {"sample_first": 1, "sample_rate": 0.5},
+    "codegen": {"codegen": True},
+    "observer": {"observer": lambda stats: None},
+}
+
+# What each option needs plain dict resources for, or doesn't mix with.
+dict_only = {"compact", "tracker", "backlinks"}
+rejected = {frozenset((a, b)) for a in dict_only
+            for b in ("views", "lazy", "slots")}
+rejected |= {frozenset(("max_errors", "views")),
+             frozenset(("max_errors", "lazy")),
+             frozenset(("slots", "views")),
+             frozenset(("slots", "lazy"))}
+
+
+def summary(doc):
+    # What validate should give whatever the options, read like callers do.
+    article = doc["data"][0]
+    author = article["author"]["data"]
+    comments = article["comments"]["data"]
+    return {
+        "title": article["title"],
+        "author": (author["firstName"], author["twitter"]),
+        "bodies": [c["body"] for c in comments],
+        "linked": comments[1]["author"]["data"] is author,
+        "dangling": comments[0]["author"]["data"]["id"],
+        "links": doc["links"]["self"],
+    }
+
+
+def person(id_):
+    return {"type": "people", "id": id_, "attributes": {
+        "firstName": "A", "lastName": "B", "twitter": "c"}}
+
+
+@pytest.fixture
+def expected(types, include, response):
+    return summary(Validator(["articles"], types, include=include).validate(
+        deepcopy(response)))
+
+
+@pytest.mark.parametrize("names", list(itertools.combinations(options, 2)))
+def test_option_pairs(names, types, include, response, expected):
+    kwargs = {}
+    for name in names:
+        kwargs.update(options[name])
+    if frozenset(names) in rejected:
+        with pytest.raises(ValueError):
+            Validator(["articles"], types, include=include, **kwargs)
+        return
+
+    validator = Validator(["articles"], types, include=include, **kwargs)
+    doc = validator.validate(deepcopy(response))
+    assert summary(doc) == expected
+
+    assert ("included" in doc) == ("drop_included" not in names)
+
+    resource = doc["data"][0]
+    if isinstance(resource, Resource):
+        return
+    doc.extend([person("2")])
+    assert ("included" in doc) == ("drop_included" not in names)
+    comment = doc["data"][0]["comments"]["data"][0]
+    assert comment["author"]["data"]["firstName"] == "A"
+
+    if isinstance(resource, dict):
+        raw = json.dumps(dump(doc))
+        again = load(json.loads(raw), validator)
+        assert summary(again) == dict(expected, dangling="2")
+        author = doc["data"][0]["author"]["data"]
+        updated = doc.apply({"data": person("9")})
+        assert updated is author and author["firstName"] == "A"
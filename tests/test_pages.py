@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from qdjarv import Validator, Type, ValidationError
+
+types = {
+    "articles": {
+        "title": Type(str),
+    },
+}
+
+
+def make_page(n, last):
+    page = {
+        "links": {},
+        "data": [{
+            "type": "articles",
+            "id": f"{n}-{i}",
+            "attributes": {"title": f"Article {n}-{i}"},
+        } for i in range(3)],
+    }
+    if n < last:
+        page["links"]["next"] = f"/articles?page={n + 1}"
+    return page
+
+
+class Fetcher:
+    def __init__(self, last, bad=None):
+        self.last = last
+        self.bad = bad
+        self.fetched = []
+
+    async def __call__(self, url):
+        await asyncio.sleep(0)
+        n = int(url.rsplit("=", 1)[1])
+        self.fetched.append(n)
+        if n == self.bad:
+            raise IOError("Connection reset")
+        return make_page(n, self.last)
+
+
+async def collect(it):
+    return [v async for v in it]
+
+
+@pytest.mark.parametrize("threads", [False, True])
+def test_iter_pages(threads):
+    validator = Validator(["articles"], types)
+    fetch = Fetcher(5)
+    with ThreadPoolExecutor(1) as pool:
+        executor = pool if threads else None
+        it = validator.iter_pages(make_page(1, 5), fetch, executor=executor)
+        res = asyncio.run(collect(it))
+    assert [v["id"] for v in res] == [f"{n}-{i}"
+                                      for n in range(1, 6) for i in range(3)]
+    assert res[-1]["title"] == "Article 5-2"
+    assert fetch.fetched == [2, 3, 4, 5]
+
+
+def test_iter_pages_errors():
+    validator = Validator(["articles"], types)
+
+    fetch = Fetcher(5, bad=3)
+    it = validator.iter_pages(make_page(1, 5), fetch)
+    with pytest.raises(IOError):
+        asyncio.run(collect(it))
+
+    bad = make_page(1, 1)
+    bad["data"][1]["attributes"]["title"] = 1
+    it = validator.iter_pages(bad, Fetcher(1))
+    with pytest.raises(ValidationError):
+        asyncio.run(collect(it))
+
+
+def test_iter_pages_in_flight_cap():
+    validator = Validator(["articles"], types)
+    fetch = Fetcher(100)
+
+    async def first_only():
+        it = validator.iter_pages(make_page(1, 100), fetch, max_in_flight=2)
+        v = await it.__anext__()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        await it.aclose()
+        return v
+
+    assert asyncio.run(first_only())["id"] == "1-0"
+    assert len(fetch.fetched) == 2
+
+    it = validator.iter_pages(make_page(1, 5), Fetcher(5), max_in_flight=0)
+    with pytest.raises(ValueError):
+        asyncio.run(collect(it))
@@ -0,0 +1,142 @@
+import datetime
+import pytest
+from qdjarv import Validator, Type, Rel, ValidationError, \
+    ValidationErrors, DateTime, Float, Optional, Nullable
+
+types = {
+    "articles": {
+        "title": Type(str),
+        "author": Rel("people"),
+    },
+    "people": {
+        "name": Type(str),
+    },
+}
+
+
+def message(n, bad=()):
+    return {
+        "data": [{
+            "type": "articles",
+            "id": str(i),
+            "attributes": {"title": 1 if i in bad else f"Article {i}"},
+            "relationships": {
+                "author": {"data": {"type": "people", "id": "1"}},
+            },
+        } for i in range(n)],
+        "included": [{
+            "type": "people",
+            "id": "1",
+            "attributes": {"name": "Dan"},
+        }],
+    }
+
+
+@pytest.mark.parametrize("views", [False, True])
+def test_sample_first(views):
+    validator = Validator(["articles"], types, include={"author": {}},
+                          sample_first=5, sample_rate=0.0, views=views)
+    msg = validator.validate(message(100, bad=range(5, 100)))
+    assert msg["data"][50]["author"]["data"]["name"] == "Dan"
+    # Unchecked resources still get flattened, but bad values that
+    # validators only check get through.
+    assert msg["data"][50]["title"] == 1
+
+    with pytest.raises(ValidationError):
+        validator.validate(message(100, bad=[4]))
+
+    # Structure is always checked.
+    bad = message(100)
+    del bad["included"]
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+    bad = message(100)
+    bad["data"][50]["type"] = "people"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+    bad = message(100)
+    bad["data"][50]["type"] = "unknown"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+
+def test_sample_rate_is_deterministic():
+    def picks(seed):
+        found = []
+        for i in range(200):
+            validator = Validator(["articles"], types, sample_rate=0.1,
+                                  seed=seed)
+            try:
+                validator.validate(message(200, bad=[i]))
+            except ValidationError:
+                found.append(i)
+        return found
+
+    first = picks(1)
+    assert 5 <= len(first) <= 40
+    assert picks(1) == first
+    assert picks(2) != first
+
+    validator = Validator(["articles"], types, sample_rate=1.0)
+    with pytest.raises(ValidationError):
+        validator.validate(message(200, bad=[199]))
+
+
+def test_sample_rate_varies_by_resource():
+    def picks(start):
+        msg = message(200, bad=range(200))
+        for i, obj in enumerate(msg["data"]):
+            obj["id"] = str(start + i)
+        validator = Validator(["articles"], types, sample_rate=0.1,
+                              max_errors=1000)
+        with pytest.raises(ValidationErrors) as e:
+            validator.validate(msg)
+        return [err.path for err in e.value.errors]
+
+    assert picks(0) == picks(0)
+    assert picks(0) != picks(1000)
+
+
+ctypes = {
+    "events": {
+        "at": DateTime(),
+        "score": Float(),
+        "note": Optional(Type(str)),
+        "venue": Nullable(Rel("venues")),
+    },
+    "venues": {},
+}
+
+
+def events(n):
+    return {"data": [{
+        "type": "events",
+        "id": str(i),
+        "attributes": {"at": "2024-05-01T10:00:00Z", "score": 1},
+    } for i in range(n)]}
+
+
+@pytest.mark.parametrize("mode", ["dicts", "views", "slots", "collect"])
+def test_sample_unchecked_shape(mode):
+    options = {"views": mode == "views", "slots": mode == "slots",
+               "max_errors": 10 if mode == "collect" else None}
+    validator = Validator(["events"], ctypes, sample_first=1,
+                          sample_rate=0.0, **options)
+    msg = validator.validate(events(3))
+    at = datetime.datetime(2024, 5, 1, 10, tzinfo=datetime.timezone.utc)
+    for obj in msg["data"]:
+        assert obj["at"] == at
+        assert type(obj["score"]) is float
+        assert obj["note"] is None
+        assert obj["venue"] == {"data": None}
+
+    if mode == "dicts":
+        cols = validator.validate_columns(events(3))
+        assert cols["events"]["note"] == [None] * 3
+        assert cols["events"]["venue"] == [None] * 3
+
+    # Converting means checking.
+    bad = events(3)
+    bad["data"][2]["attributes"]["at"] = "yesterday"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
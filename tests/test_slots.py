@@ -0,0 +1,67 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, Rel, Resource, ResourceStore
+
+
+def test_slots_resources(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          slots=True)
+    msg = validator.validate(deepcopy(response))
+
+    article = msg["data"][0]
+    assert isinstance(article, Resource)
+    assert not hasattr(article, "__dict__")
+    assert type(article).__name__ == "articles"
+    assert article.type == "articles"
+    assert article.id == "1"
+    assert article.title == "JSON:API paints my bikeshed!"
+    assert article["title"] == article.title
+    assert article.links == {"self": "http://example.com/articles/1"}
+    assert article.meta is None
+
+    author = article.author["data"]
+    assert author is msg["included"][0]
+    assert author.firstName == "Dan"
+    assert article.comments["data"][1].author["data"] is author
+    assert article.comments["data"][0].author["data"] == {
+        "type": "people", "id": "2"}
+
+
+def test_slots_odd_names():
+    otypes = {
+        "blog-posts": {
+            "first-name": Type(str),
+            "first_name": Type(str),
+            "class": Type(str),
+            "owner": Rel("blog-posts"),
+        },
+    }
+    validator = Validator(top="blog-posts", types=otypes,
+                          fields={"blog-posts": ["first-name", "owner"]},
+                          slots=True)
+    msg = validator.validate({
+        "data": {
+            "type": "blog-posts",
+            "id": "1",
+            "attributes": {"first-name": "a", "class": "c"},
+            "relationships": {
+                "owner": {"data": {"type": "blog-posts", "id": "1"}},
+            },
+        },
+    })
+    post = msg["data"]
+    assert post["first-name"] == "a"
+    assert getattr(post, "class") == "c"
+    assert post.first_name == "a"
+    assert "first_name" not in post
+    with pytest.raises(AttributeError):
+        post.first_name_
+    assert post.owner["data"] is post
+
+
+def test_slots_conflicts(types, response):
+    with pytest.raises(ValueError):
+        Validator(top=["articles"], types=types, slots=True, views=True)
+    validator = Validator(top=["articles"], types=types, slots=True)
+    with pytest.raises(ValueError):
+        validator.validate(deepcopy(response), store=ResourceStore())
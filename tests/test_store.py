@@ -0,0 +1,85 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, Rel, ResourceStore
+
+types = {
+    "articles": {
+        "title": Type(str),
+        "author": Rel("people"),
+    },
+    "people": {
+        "name": Type(str),
+    },
+}
+
+
+def page(article_id, name=None, extra=None):
+    msg = {
+        "data": [{
+            "type": "articles",
+            "id": article_id,
+            "attributes": {"title": f"Article {article_id}"},
+            "relationships": {
+                "author": {"data": {"type": "people", "id": "9"}},
+            },
+        }],
+    }
+    if name is not None:
+        attrs = {"name": name}
+        if extra is not None:
+            attrs.update(extra)
+        msg["included"] = [{
+            "type": "people",
+            "id": "9",
+            "attributes": attrs,
+        }]
+    return msg
+
+
+def test_store_interns_across_responses():
+    store = ResourceStore()
+    validator = Validator(["articles"], types, include={"author": {}})
+
+    first = validator.validate(page("1", "Dan", {"twitter": "dgeb"}), store)
+    second = validator.validate(page("2", "Daniel"), store=store)
+
+    author = first["data"][0]["author"]["data"]
+    assert second["data"][0]["author"]["data"] is author
+    assert second["included"][0] is author
+    assert store.get("people", "9") is author
+    assert ("people", "9") in store
+    assert len(store) == 3
+
+    # Newer attributes win, older ones we didn't get again are kept.
+    assert author["name"] == "Daniel"
+    assert author[".attributes"] == {"name": "Daniel", "twitter": "dgeb"}
+    assert author["twitter"] == "dgeb"
+
+    # Linked to the stored author even though it wasn't included.
+    third = validator.validate(page("3"), store=store)
+    assert third["data"][0]["author"]["data"] is author
+
+
+def test_store_size_bound():
+    store = ResourceStore(max_size=2)
+    validator = Validator(["articles"], types)
+    validator.validate(page("1", "Dan"), store=store)
+    validator.validate(page("2"), store=store)
+    assert len(store) == 2
+    assert ("articles", "1") not in store
+    assert ("people", "9") in store
+
+    # Linking page 2 to the stored author used it, so page 2 goes first.
+    msg = validator.validate(page("3"), store=store)
+    assert msg["data"][0]["author"]["data"]["name"] == "Dan"
+    assert ("articles", "2") not in store
+    assert ("people", "9") in store
+
+    store.clear()
+    assert len(store) == 0
+
+
+def test_store_needs_dicts():
+    validator = Validator(["articles"], types, views=True)
+    with pytest.raises(ValueError):
+        validator.validate(deepcopy(page("1")), store=ResourceStore())
@@ -0,0 +1,124 @@
+import io
+import json
+import pytest
+from qdjarv import Validator, Type, ValidationError, ResourceView
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_stream_all_is_well(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    raw = json.dumps(response, indent=2).encode()
+
+    for chunk_size in (1, 7, 65536):
+        msg = validator.validate_stream(io.BytesIO(raw), chunk_size)
+        author_obj = msg["data"][0]
+        assert author_obj["author"]["data"]["firstName"] == "Dan"
+        assert author_obj["comments"]["data"][0]["body"] == "First!"
+        assert msg["links"] == response["links"]
+        assert len(msg["included"]) == 3
+
+    msg = validator.validate_stream(io.StringIO(json.dumps(response)))
+    assert msg["data"][0]["title"] == "JSON:API paints my bikeshed!"
+
+
+def test_stream_single_and_unicode():
+    validator = Validator(top="articles", types={
+        "articles": {"title": Type(str)},
+    })
+    raw = json.dumps({
+        "data": {
+            "type": "articles",
+            "id": "1",
+            "attributes": {"title": "Zażółć gęślą jaźń"},
+        },
+        "meta": {"count": 12345},
+    }, ensure_ascii=False).encode()
+    msg = validator.validate_stream(io.BytesIO(raw), chunk_size=3)
+    assert msg["data"]["title"] == "Zażółć gęślą jaźń"
+    assert msg["meta"] == {"count": 12345}
+
+
+def test_stream_fails_fast(types):
+    validator = Validator(top=["articles"], types=types)
+    bad = {
+        "data": [{
+            "type": "articles",
+            "id": str(i),
+            "attributes": {"title": 1},
+            "relationships": {"author": {}, "comments": {}},
+        } for i in range(1000)],
+    }
+    fp = CountingReader(json.dumps(bad).encode())
+    with pytest.raises(ValidationError):
+        validator.validate_stream(fp, chunk_size=256)
+    assert fp.reads < 5
+
+    fp = io.StringIO(json.dumps({"data": {"type": "articles", "id": "1"}}))
+    with pytest.raises(ValidationError):
+        validator.validate_stream(fp)
+
+
+def test_stream_bad_json(types):
+    validator = Validator(top=["articles"], types=types)
+    with pytest.raises(ValueError):
+        validator.validate_stream(io.StringIO('{"data": [{"type": '))
+    with pytest.raises(ValueError):
+        validator.validate_stream(io.StringIO('{"data": []} []'))
+
+
+def test_stream_bad_json_fails_fast(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include)
+    message = dict(response, included=response["included"] * 20000)
+    raw = json.dumps(message)
+    # Drop a colon in the 6th included item.
+    pos = raw.index('"included"')
+    for _ in range(6):
+        pos = raw.index('"type": ', pos + 1)
+    raw = raw[:pos] + '"type" ' + raw[pos + len('"type": '):]
+    fp = CountingReader(raw.encode())
+    with pytest.raises(ValueError):
+        validator.validate_stream(fp, chunk_size=4096)
+    assert fp.reads < 5
+
+
+def test_stream_long_values():
+    validator = Validator(top="articles", types={
+        "articles": {"title": Type(str)},
+    })
+    title = "ż" * 100000
+    raw = json.dumps({
+        "data": {"type": "articles", "id": "1",
+                 "attributes": {"title": title}},
+    }, ensure_ascii=False).encode()
+    fp = CountingReader(raw)
+    msg = validator.validate_stream(fp, chunk_size=1)
+    assert msg["data"]["title"] == title
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_stream_views(lazy, types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          views=True, lazy=lazy)
+    raw = json.dumps(response)
+    msg = validator.validate_stream(io.StringIO(raw), chunk_size=64)
+    article = msg["data"][0]
+    assert article["author"]["data"] is msg["included"][0]
+    assert article["comments"]["data"][1]["body"] == "I like XML better"
+    assert article[".attributes"] == {"title": "JSON:API paints my bikeshed!"}
+    assert isinstance(article, ResourceView)
+
+    single = Validator(top="articles", types={
+        "articles": {"title": Type(str)}}, views=True)
+    msg = single.validate_stream(io.StringIO(json.dumps({
+        "data": {"type": "articles", "id": "1",
+                 "attributes": {"title": "T"}}})))
+    assert msg["data"]["title"] == "T"
@@ -0,0 +1,96 @@
+import json
+import pickle
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, AccessTracker, ResourceStore, dump, load
+
+
+def test_tracking(types, include, response):
+    tracker = AccessTracker()
+    validator = Validator(top=["articles"], types=types, include=include,
+                          tracker=tracker)
+    msg = validator.validate(deepcopy(response))
+    assert tracker.accessed() == {"articles": [], "people": [],
+                                  "comments": []}
+
+    article = msg["data"][0]
+    assert article["title"] == "JSON:API paints my bikeshed!"
+    author = article["author"]["data"]
+    assert author is msg["included"][0]
+    assert author.get("twitter") == "dgeb"
+    assert article["comments"]["data"][0].get(".links") is not None
+
+    msg = validator.validate(deepcopy(response))
+    msg["data"][0]["comments"]["data"][1]["body"]
+    assert tracker.accessed() == {
+        "articles": ["author", "comments", "title"],
+        "people": ["twitter"],
+        "comments": ["body"],
+    }
+    assert tracker.report(validator)["people"] == {
+        "read": ["twitter"],
+        "unused": ["firstName", "lastName"],
+    }
+    assert tracker.suggest_fields(validator) == {
+        "articles": ["title", "author", "comments"],
+        "people": ["twitter"],
+        "comments": ["body"],
+    }
+
+    copied = pickle.loads(pickle.dumps(msg))
+    assert type(copied["data"][0]) is dict
+
+    tracker.clear()
+    assert tracker.accessed() == {}
+
+
+def test_tracking_modes(types, include, response):
+    tracker = AccessTracker()
+    validator = Validator(top=["articles"], types=types, include=include,
+                          tracker=tracker, max_errors=10, compact=True)
+    msg = validator.validate(deepcopy(response))
+    assert msg["included"][0]["lastName"] == "Gebhardt"
+    assert tracker.accessed()["people"] == ["lastName"]
+
+    with pytest.raises(ValueError):
+        validator.validate(deepcopy(response), store=ResourceStore())
+    with pytest.raises(ValueError):
+        Validator(top=["articles"], types=types, tracker=tracker, views=True)
+
+
+def test_tracking_whole_resource(types, include, response):
+    tracker = AccessTracker()
+    validator = Validator(top=["articles"], types=types, include=include,
+                          tracker=tracker)
+    msg = validator.validate(deepcopy(response))
+    article = msg["data"][0]
+    # Nothing read yet: suggest everything the validator checks, not [].
+    assert tracker.suggest_fields(validator) == validator.derive_fields()
+
+    assert "title" in article
+    assert tracker.accessed()["articles"] == ["title"]
+    msg["included"][0].items()
+    assert tracker.accessed()["people"] == [
+        "firstName", "lastName", "twitter"]
+
+    msg = validator.validate(deepcopy(response))
+    comment = msg["data"][0]["comments"]["data"][0]
+    assert json.loads(json.dumps({k: comment[k] for k in ("type", "body")}))
+    assert tracker.accessed()["comments"] == ["body"]
+    json.dumps(dict(comment))
+    assert "author" in tracker.accessed()["comments"]
+
+
+def test_tracking_dump(types, include, response):
+    tracker = AccessTracker()
+    validator = Validator(top=["articles"], types=types, include=include,
+                          tracker=tracker)
+    doc = validator.validate(deepcopy(response))
+    raw = json.dumps(dump(doc))
+    assert tracker.accessed() == {"articles": [], "people": [],
+                                  "comments": []}
+
+    msg = load(json.loads(raw), validator)
+    assert msg["included"][0]["twitter"] == "dgeb"
+    assert msg["data"][0]["author"]["data"] is msg["included"][0]
+    assert tracker.accessed()["people"] == ["twitter"]
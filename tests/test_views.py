@@ -0,0 +1,84 @@
+import pytest
+from copy import deepcopy
+from qdjarv import Validator, Type, Rel, ValidationError, ResourceView
+
+
+@pytest.mark.parametrize("codegen", [False, True])
+def test_views_leave_message_alone(codegen, types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          views=True, codegen=codegen)
+    original = deepcopy(response)
+    msg = validator.validate(response)
+    assert response == original
+
+    article = msg["data"][0]
+    assert isinstance(article, ResourceView)
+    assert article["title"] == "JSON:API paints my bikeshed!"
+    assert article["type"] == "articles"
+    assert article[".links"] == {"self": "http://example.com/articles/1"}
+    assert article[".attributes"] is response["data"][0]["attributes"]
+    assert "attributes" not in article
+    assert "relationships" not in article
+
+    author = article["author"]["data"]
+    assert author is msg["included"][0]
+    assert author["firstName"] == "Dan"
+    assert article["author"] is article[".relationships"]["author"]
+    assert article["comments"]["data"][1]["author"]["data"] is author
+
+    # Not included, left as a reference.
+    first = article["comments"]["data"][0]
+    assert first["author"]["data"] == {"type": "people", "id": "2"}
+
+    assert set(article) == {"type", "id", ".relationships", ".links",
+                            ".attributes", "title", "author", "comments"}
+    assert msg["links"] is response["links"]
+
+
+def test_views_validated_values():
+    vtypes = {
+        "articles": {
+            "title": lambda v: v.upper(),
+            "body": Type(str),
+        },
+    }
+    message = {
+        "data": {
+            "type": "articles",
+            "id": "1",
+            "attributes": {"title": "foo", "body": "bar"},
+        },
+    }
+    validator = Validator(top="articles", types=vtypes, views=True)
+    res = validator.validate(message)
+    assert res["data"]["title"] == "FOO"
+    assert res["data"]["body"] == "bar"
+    assert message["data"]["attributes"]["title"] == "foo"
+    assert dict(res["data"])["title"] == "FOO"
+
+
+def test_views_errors(types, include, response):
+    validator = Validator(top=["articles"], types=types, include=include,
+                          views=True)
+
+    bad = deepcopy(response)
+    bad["data"][0]["attributes"]["title"] = 1
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    bad = deepcopy(response)
+    del bad["included"][0]
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+    ntypes = {"articles": {"author": Rel("people")}, "people": {}}
+    validator = Validator("articles", ntypes, include={"author": {}},
+                          views=True)
+    res = validator.validate({
+        "data": {
+            "type": "articles",
+            "id": "1",
+            "relationships": {"author": {"data": None}},
+        },
+    })
+    assert res["data"]["author"]["data"] is None